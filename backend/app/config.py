@@ -12,12 +12,31 @@ class Settings(BaseSettings):
     # Database
     mongo_uri: str = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
     database_name: str = os.getenv("DATABASE_NAME", "campus_connect")
+    # Connection pool, per client (0 = driver default / no limit)
+    mongo_max_pool_size: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+    mongo_min_pool_size: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+    mongo_max_idle_time_ms: int = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "0"))
+    mongo_wait_queue_timeout_ms: int = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "0"))
+    # Read routing for the read-only matching traffic (suggestions, quick intent);
+    # auth and intent writes always use the primary
+    matching_read_preference: str = os.getenv("MATCHING_READ_PREFERENCE", "primary")
+    matching_read_concern: str = os.getenv("MATCHING_READ_CONCERN", "local")
+    matching_max_staleness_seconds: int = int(os.getenv("MATCHING_MAX_STALENESS_SECONDS", "-1"))
     
     # Security
     secret_key: str = os.getenv("SECRET_KEY", "dev-secret-key-12345")
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Password hashing (bcrypt cost changes are applied on next login)
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    password_hash_queue_limit: int = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+    
+    # Bulk user import (0 hash workers = one per CPU core)
+    import_batch_size: int = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+    import_hash_workers: int = int(os.getenv("IMPORT_HASH_WORKERS", "0"))
+    
     # API
     api_title: str = "<DEV / DEX>"
     api_version: str = "1.0.0"
@@ -25,8 +44,48 @@ class Settings(BaseSettings):
     
     # Intent
     intent_expiration_hours: int = 48
+    # Expired intents are archived in the background (0 seconds disables the sweeper)
+    intent_sweep_interval_seconds: int = int(os.getenv("INTENT_SWEEP_INTERVAL_SECONDS", "300"))
+    intent_sweep_batch_size: int = int(os.getenv("INTENT_SWEEP_BATCH_SIZE", "1000"))
     min_compatibility_score: int = 50
     
+    # Matching
+    matcher_chunk_size: int = int(os.getenv("MATCHER_CHUNK_SIZE", "1000"))
+    # "python": score in the app (numpy); "pipeline": score inside MongoDB;
+    # "lsh": approximate candidates from MinHash/LSH, then exact scoring;
+    # "sharded": exact scoring split across worker processes;
+    # "snapshot": exact scoring against a memory-mapped pool snapshot
+    matcher_engine: str = os.getenv("MATCHER_ENGINE", "python").lower()
+    # "sharded" engine: worker processes, one shard each (0 = one per CPU core)
+    matcher_shard_workers: int = int(os.getenv("MATCHER_SHARD_WORKERS", "0"))
+    # "snapshot" engine: file written by jobs/build_match_snapshot.py, shared
+    # read-only by every worker; checked for a newer version this often
+    match_snapshot_path: str = os.getenv("MATCH_SNAPSHOT_PATH", "data/match_pool.snap")
+    match_snapshot_check_seconds: int = int(os.getenv("MATCH_SNAPSHOT_CHECK_SECONDS", "30"))
+    
+    # "lsh" engine: MinHash signatures over skill/interest/keyword ids in LSH
+    # band buckets; only the best bucket-mates are scored exactly
+    lsh_num_perm: int = int(os.getenv("LSH_NUM_PERM", "64"))
+    lsh_bands: int = int(os.getenv("LSH_BANDS", "32"))
+    lsh_max_candidates: int = int(os.getenv("LSH_MAX_CANDIDATES", "500"))
+    
+    # Change streams on users/intents keep the in-process match state current
+    # when other workers or scripts write to Mongo (needs a replica set)
+    change_feed_enabled: bool = os.getenv("CHANGE_FEED_ENABLED", "false").lower() == "true"
+    change_feed_batch_size: int = int(os.getenv("CHANGE_FEED_BATCH_SIZE", "500"))
+    change_feed_max_await_ms: int = int(os.getenv("CHANGE_FEED_MAX_AWAIT_MS", "1000"))
+    
+    # Suggestion cache (0 entries disables it)
+    suggestion_cache_size: int = int(os.getenv("SUGGESTION_CACHE_SIZE", "10000"))
+    suggestion_cache_ttl_seconds: int = int(os.getenv("SUGGESTION_CACHE_TTL_SECONDS", "300"))
+    
+    # Serialize trusted DB documents straight to JSON bytes (orjson), skipping
+    # response_model re-validation; the OpenAPI schema is unchanged
+    fast_responses: bool = os.getenv("FAST_RESPONSES", "true").lower() == "true"
+    
+    # Observability (/metrics, per-stage timings, Mongo command counts)
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    
     model_config = ConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -1,7 +1,13 @@
 # app/database.py
 from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import (
+    Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
+)
 from .config import settings
+from .utils.metrics import mongo_event_listeners
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,13 +16,54 @@ logger = logging.getLogger(__name__)
 # CONNECTION
 # ============================================
 
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def pool_options() -> dict:
+    """Pool settings shared by the sync and async clients (0 = driver default)"""
+    
+    return {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "maxIdleTimeMS": settings.mongo_max_idle_time_ms or None,
+        "waitQueueTimeoutMS": settings.mongo_wait_queue_timeout_ms or None,
+    }
+
+
+def matching_read_options() -> dict:
+    """read_preference / read_concern for the matching service's collections"""
+    
+    mode = READ_PREFERENCES.get(settings.matching_read_preference)
+    if mode is None:
+        raise ValueError(
+            f"MATCHING_READ_PREFERENCE must be one of {', '.join(READ_PREFERENCES)}, "
+            f"got {settings.matching_read_preference!r}"
+        )
+    if mode is Primary:
+        read_preference = Primary()
+    else:
+        read_preference = mode(max_staleness=settings.matching_max_staleness_seconds)
+    return {
+        "read_preference": read_preference,
+        "read_concern": ReadConcern(settings.matching_read_concern),
+    }
+
+
 try:
+    # connect=False: no monitor threads or handshakes until the first operation
     client = MongoClient(
         settings.mongo_uri,
-        serverSelectionTimeoutMS=5000
+        serverSelectionTimeoutMS=5000,
+        event_listeners=mongo_event_listeners(),
+        connect=False,
+        **pool_options()
     )
-    # Don't ping on import - let the lifespan handle it
-    # This prevents the app from crashing before it even starts
     logger.info("📡 MongoDB client initialized")
 except Exception as e:
     logger.error(f"❌ MongoDB client initialization failed: {e}")
@@ -26,6 +73,17 @@ except Exception as e:
 
 db = client[settings.database_name]
 
+# Async client used by the request handlers; the sync client above stays
+# for scripts (seeds, benchmarks) and one-off startup work. Motor clients
+# also connect lazily, on the first awaited operation.
+async_client = AsyncIOMotorClient(
+    settings.mongo_uri,
+    serverSelectionTimeoutMS=5000,
+    event_listeners=mongo_event_listeners(),
+    **pool_options()
+)
+async_db = async_client[settings.database_name]
+
 # ============================================
 # COLLECTIONS
 # ============================================
@@ -33,22 +91,19 @@ db = client[settings.database_name]
 users_collection = db["users"]
 intents_collection = db["intents"]
 collaborations_collection = db["collaborations"]
+vocabulary_collection = db["vocabulary"]
+counters_collection = db["counters"]
 
-# ============================================
-# INDEXES (Performance optimization)
-# ============================================
+async_users_collection = async_db["users"]
+async_intents_collection = async_db["intents"]
 
-try:
-    users_collection.create_index("email", unique=True)
-    users_collection.create_index("created_at")
-    
-    intents_collection.create_index("user_id")
-    intents_collection.create_index("keywords")
-    intents_collection.create_index("expires_at")
-    
-    collaborations_collection.create_index("target_user_id")
-    collaborations_collection.create_index("status")
-    
-    logger.info("✅ Database indexes created")
-except Exception as e:
-    logger.warning(f"⚠️  Index creation issue: {e}")
\ No newline at end of file
+# Matching reads (candidate scans, display fields, keyword index builds) may
+# go to secondaries; anything that must see its own writes uses the above
+_matching_read = matching_read_options()
+matching_users_collection = db.get_collection("users", **_matching_read)
+matching_intents_collection = db.get_collection("intents", **_matching_read)
+async_matching_users_collection = async_db.get_collection("users", **_matching_read)
+async_matching_intents_collection = async_db.get_collection("intents", **_matching_read)
+
+# Indexes are managed by migrations/create_indexes.py (run once per deploy),
+# so importing this module never talks to the server.
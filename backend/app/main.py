@@ -1,8 +1,11 @@
 # app/main.py
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
+import json
 
 # Configure logging
 logging.basicConfig(
@@ -13,32 +16,111 @@ logging.basicConfig(
 # Add missing imports
 from app.config import settings
 from app.routes import auth, intent, suggestions
-from app.database import client, users_collection
-from app.services.parser import extract_keywords
+from fastapi.concurrency import run_in_threadpool
+from app.database import async_client, matching_users_collection
+from app.services.keyword_index import keyword_index
+from app.services.password_hasher import password_hasher
+from app.services.intent_expiry import intent_sweeper
+from app.services.lsh_index import lsh_index, iter_user_tokens
+from app.services.candidates import iter_candidate_fields
+from app.services.change_feed import change_feed
+from app.services.matcher import INTENTS_PER_USER
+from app.services.match_snapshot import match_snapshot
+from app.services.shard_pool import shard_pool
+from app.services.suggestion_cache import suggestion_cache
+from app.services.intent_search import (
+    InvalidCursor, decode_cursor, encode_cursor, find_overlaps, iter_results, query_fingerprint
+)
+from app.services.vocabulary import token_vocabulary
+from app.utils.metrics import MetricsMiddleware, registry
 
 
 logger = logging.getLogger(__name__)
 
+QUICK_INTENT_LIMIT = 15
+QUICK_INTENT_MAX_LIMIT = 100
+
 
 # ============================================
 # STARTUP/SHUTDOWN
 # ============================================
 
+async def warm_up() -> None:
+    """Fill in-process caches after startup; every one of them also fills on first use"""
+    
+    # FAILURE POINT 1: Database not reachable (requests will fail until it is)
+    try:
+        await async_client.admin.command('ping')
+        logger.info("✅ Database connected")
+    except Exception as e:
+        logger.error(f"❌ Database connection failed: {e}")
+        return
+    
+    # Fix the change feed position before the builds below take their snapshot,
+    # so writes made during a build are applied afterwards (a match snapshot
+    # mapped below is older still: the feed rewinds to its scan on its own)
+    if settings.change_feed_enabled:
+        try:
+            await change_feed.start()
+        except Exception as e:
+            logger.warning(f"⚠️  Change feed failed to start, in-process state only follows this worker's writes: {e}")
+    
+    # Snapshot engine: startup is a file open (the builder job does the scan)
+    if settings.matcher_engine == "snapshot":
+        try:
+            if not await run_in_threadpool(match_snapshot.open) and not match_snapshot.ready:
+                logger.warning(f"⚠️  No match snapshot at {settings.match_snapshot_path}, using in-process matching "
+                               f"until jobs/build_match_snapshot.py publishes one")
+        except Exception as e:
+            logger.warning(f"⚠️  Match snapshot failed to open, using in-process matching: {e}")
+    
+    # Build the skill/interest inverted index used by POST /intent
+    try:
+        await run_in_threadpool(keyword_index.ensure_built, matching_users_collection)
+    except Exception as e:
+        logger.warning(f"⚠️  Keyword index build failed, will retry on first use: {e}")
+    
+    # Warm the token id cache (misses are filled from the collection anyway)
+    try:
+        await run_in_threadpool(token_vocabulary.load)
+    except Exception as e:
+        logger.warning(f"⚠️  Token vocabulary load failed: {e}")
+    
+    # Approximate engine: until this is built, matching falls back to the exact scan
+    if settings.matcher_engine == "lsh":
+        try:
+            await run_in_threadpool(lsh_index.ensure_built, lambda: iter_user_tokens(INTENTS_PER_USER))
+        except Exception as e:
+            logger.warning(f"⚠️  LSH index build failed, using exact matching: {e}")
+    
+    # Sharded engine: workers load their slice once; in-process scan until then
+    if settings.matcher_engine == "sharded":
+        try:
+            await run_in_threadpool(shard_pool.ensure_built, lambda: iter_candidate_fields(INTENTS_PER_USER))
+        except Exception as e:
+            logger.warning(f"⚠️  Matching shards failed to load, using in-process matching: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle startup and shutdown events"""
     
-    # FAILURE POINT 1: Database not reachable on startup
-    try:
-        client.admin.command('ping')
-        logger.info("✅ App startup: Database connected")
-    except Exception as e:
-        logger.error(f"❌ Database connection failed on startup: {e}")
-        raise
+    # No server round trips before accepting traffic: the clients connect
+    # lazily and the caches warm in the background
+    warm_up_task = asyncio.create_task(warm_up())
+    password_hasher.start()
+    intent_sweeper.start()
+    logger.info("✅ App startup complete")
     
     yield
     
     # Cleanup
+    warm_up_task.cancel()
+    await change_feed.shutdown()
+    await intent_sweeper.shutdown()
+    password_hasher.shutdown()
+    shard_pool.shutdown()
+    async_client.close()
     logger.info("App shutdown")
 
 
@@ -67,6 +149,29 @@ app.add_middleware(
 )
 
 
+# Request timing + per-request Mongo command counts for /metrics
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    registry.gauge_callback(
+        "suggestion_cache", "Suggestion cache state and counters", suggestion_cache.stats
+    )
+    registry.gauge_callback(
+        "password_hasher", "Password hashing pool load",
+        lambda: {
+            "in_flight": password_hasher.in_flight,
+            "capacity": password_hasher.capacity,
+            "rejected": password_hasher.rejected,
+        }
+    )
+    registry.gauge_callback("intent_sweeper", "Expired intent archiving", intent_sweeper.stats)
+    registry.gauge_callback(
+        "lsh_index", "Approximate matching index", lambda: {"users": len(lsh_index), "ready": int(lsh_index.ready)}
+    )
+    registry.gauge_callback("shard_pool", "Sharded matching workers", shard_pool.stats)
+    registry.gauge_callback("match_snapshot", "Memory-mapped match pool snapshot", match_snapshot.stats)
+    registry.gauge_callback("change_feed", "Change stream subscriber and match state staleness", change_feed.stats)
+
+
 # ============================================
 # ROUTES
 # ============================================
@@ -87,7 +192,7 @@ except Exception as e:
 # ============================================
 
 @app.get("/")
-def root():
+async def root():
     return {
         "message": "Welcome to <DEV / DEX> API",
         "docs": "/docs",
@@ -96,70 +201,95 @@ def root():
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "ok", "environment": settings.environment}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of in-process histograms and counters"""
+    
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/intent")
-def quick_intent(payload: dict):
+async def quick_intent(payload: dict):
     try:
-        text = payload.get("intent", "")
-        if not isinstance(text, str) or not text.strip():
-            return []
-        keywords = [k.lower() for k in extract_keywords(text) if isinstance(k, str)]
-        if not keywords:
+        _, overlaps = await find_overlaps(payload.get("intent", ""))
+        if not overlaps:
             return []
-            
-        keyword_set = set(keywords)
+        
         results = []
-        users = list(users_collection.find({"is_deleted": False}))
+        async for _, result in iter_results(overlaps):
+            results.append(result)
+            if len(results) == QUICK_INTENT_LIMIT:
+                break
+        return results
+    except Exception as e:
+        logger.error(f"POST /intent error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to process intent")
+
+
+@app.post("/intent/search")
+async def quick_intent_search(payload: dict):
+    """Keyset-paginated quick intent results: pass `next_cursor` back as `cursor`"""
+    
+    limit = payload.get("limit", QUICK_INTENT_LIMIT)
+    if not isinstance(limit, int) or limit < 1:
+        limit = QUICK_INTENT_LIMIT
+    limit = min(limit, QUICK_INTENT_MAX_LIMIT)
+    
+    try:
+        keywords, overlaps = await find_overlaps(payload.get("intent", ""))
+        fingerprint = query_fingerprint(keywords)
         
-        for u in users:
-            name = u.get("name") or "User"
-            skills_raw = u.get("skills", [])
-            interests_raw = u.get("interests", [])
-            
-            skills = [s.lower() for s in skills_raw if isinstance(s, str)]
-            interests = [i.lower() for i in interests_raw if isinstance(i, str)]
-            
-            user_tokens = set(skills) | set(interests)
-            overlap = list(user_tokens & keyword_set)
-            
-            if not overlap:
-                continue
-            
-            # Suitability score based on overlap count and quality
-            score = len(overlap)
-            
-            # Create expertise data from real skills
-            # Assign realistic but varied proficiency levels
-            expertise = []
-            for i, skill in enumerate(skills_raw[:4]):
-                # Base level between 65 and 95
-                level = 95 - (i * 8) - (len(skill) % 5)
-                expertise.append({"skill": skill, "level": max(60, min(95, level))})
-                
-            results.append({
-                "name": name,
-                "email": u.get("email"),
-                "reason": f"Shares expertise in {', '.join(overlap[:3])}",
-                "expertise": expertise,
-                "suitability_score": score
-            })
-            
-        # Sort by suitability score descending
-        results.sort(key=lambda x: x["suitability_score"], reverse=True)
+        # FAILURE POINT: cursor tampered with or reused for another query
+        after = None
+        if payload.get("cursor"):
+            try:
+                after = decode_cursor(str(payload["cursor"]), fingerprint)
+            except InvalidCursor as e:
+                raise HTTPException(status_code=400, detail=str(e))
         
-        # Assign alignment tags based on rank
-        for i, res in enumerate(results):
-            if i < 3:
-                res["tag"] = "High Alignment"
-            else:
-                res["tag"] = "Medium Alignment"
-            # Remove score from response
-            del res["suitability_score"]
-            
-        return results[:15]
+        results = []
+        last = None
+        has_more = False
+        async for cursor, result in iter_results(overlaps, after, page_size=limit + 1):
+            if len(results) == limit:
+                has_more = True
+                break
+            results.append(result)
+            last = cursor
+        
+        return {
+            "results": results,
+            "next_cursor": encode_cursor(last, fingerprint) if has_more else None
+        }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"POST /intent error: {e}")
+        logger.error(f"POST /intent/search error: {e}")
         raise HTTPException(status_code=500, detail="Failed to process intent")
+
+
+@app.post("/intent/stream")
+async def quick_intent_stream(payload: dict):
+    """All quick intent results as NDJSON, one line per result, best first"""
+    
+    try:
+        _, overlaps = await find_overlaps(payload.get("intent", ""))
+    except Exception as e:
+        logger.error(f"POST /intent/stream error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to process intent")
+    
+    async def lines():
+        try:
+            async for _, result in iter_results(overlaps):
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            # Headers are already sent: log and end the stream early
+            logger.error(f"POST /intent/stream aborted: {e}")
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -1,6 +1,6 @@
 # app/models/intent.py
 from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 from bson import ObjectId
 from enum import Enum
@@ -32,6 +32,20 @@ class IntentCreate(BaseModel):
         return v.strip()
 
 
+class IntentBatchItem(IntentCreate):
+    """One intent of a batch submission"""
+    user_id: str
+
+
+class IntentBatchCreate(BaseModel):
+    """Batch submission; items are validated one by one so a bad item fails alone
+
+    Items that do not fit IntentBatchItem stay plain dicts here (rather than
+    failing the whole request) and get their own error in the response.
+    """
+    items: List[Union[IntentBatchItem, Dict[str, Any]]] = Field(..., min_length=1, max_length=1000)
+
+
 class IntentUpdate(BaseModel):
     """Update intent"""
     text: Optional[str] = None
@@ -76,4 +90,21 @@ class IntentResponse(BaseModel):
     """API response wrapper for intent operations"""
     success: bool
     message: str
-    data: Optional[IntentInDB] = None
\ No newline at end of file
+    data: Optional[IntentInDB] = None
+
+
+class IntentBatchResult(BaseModel):
+    """Outcome of one batch item (index into the submitted list)"""
+    index: int
+    success: bool
+    intent_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class IntentBatchResponse(BaseModel):
+    """API response wrapper for batch intent submission"""
+    success: bool
+    message: str
+    submitted: int
+    failed: int
+    results: List[IntentBatchResult]
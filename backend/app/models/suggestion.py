@@ -0,0 +1,9 @@
+# app/models/suggestion.py
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class SuggestionBatchRequest(BaseModel):
+    """Suggestions for many users in one run (digests, precompute jobs)"""
+    user_ids: List[str] = Field(..., min_length=1, max_length=1000)
+    limit: int = 5
@@ -1,26 +1,53 @@
 # app/routes/auth.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, UploadFile, File
 from app.models.user import UserCreate, UserUpdate, UserInDB, UserResponse, UserLogin
-from app.database import users_collection
+from app.database import async_users_collection
 from app.config import settings
-from passlib.context import CryptContext
+from app.services.keyword_index import keyword_index
+from app.services.matcher import invalidate_suggestions, refresh_match_index
+from app.services.password_hasher import password_hasher, PasswordPoolFull
+from app.services.vocabulary import token_vocabulary
+from app.services.user_import import import_users, read_records
+from app.utils.fast_json import FastJSONResponse, user_document
+from app.utils.metrics import span
 from bson import ObjectId
 from datetime import datetime
+from typing import Optional
+import asyncio
+import io
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"])
+# One bulk import at a time: each one already uses every core for bcrypt
+_import_lock = asyncio.Lock()
+
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server busy, please retry shortly",
+        headers={"Retry-After": "1"}
+    )
+
+
+def _user_response(message: str, user: dict):
+    """UserResponse for a document straight from Mongo (fast path skips re-validation)"""
+    
+    if settings.fast_responses:
+        return FastJSONResponse({"success": True, "message": message, "data": user_document(user)})
+    return UserResponse(success=True, message=message, data=UserInDB(**user))
 
 
 @router.post("/register", response_model=UserResponse)
-def register(user: UserCreate):
+async def register(user: UserCreate):
     """Register new user"""
     
     # FAILURE POINT 1: Email already exists
     try:
-        existing = users_collection.find_one({"email": user.email})
+        with span("auth.register.email_check"):
+            existing = await async_users_collection.find_one({"email": user.email})
         if existing:
             logger.warning(f"Registration attempt with existing email: {user.email}")
             raise HTTPException(status_code=400, detail="Email already registered")
@@ -32,7 +59,9 @@ def register(user: UserCreate):
     
     # FAILURE POINT 2: Password hashing fails
     try:
-        hashed_password = pwd_context.hash(user.password)
+        # bcrypt runs in the dedicated hashing pool
+        with span("auth.register.hash"):
+            hashed_password = await password_hasher.hash(user.password)
         
         user_dict = {
             "email": user.email,
@@ -40,6 +69,8 @@ def register(user: UserCreate):
             "name": user.name,
             "skills": user.skills,
             "interests": user.interests,
+            "skill_ids": await token_vocabulary.ids_for_async(user.skills),
+            "interest_ids": await token_vocabulary.ids_for_async(user.interests),
             "bio": user.bio,
             "availability": "ACTIVE",
             "is_deleted": False,
@@ -47,44 +78,63 @@ def register(user: UserCreate):
             "updated_at": datetime.utcnow()
         }
         
-        result = users_collection.insert_one(user_dict)
+        with span("auth.register.insert"):
+            result = await async_users_collection.insert_one(user_dict)
         user_dict["_id"] = result.inserted_id
+        keyword_index.upsert_user(user_dict)
+        await invalidate_suggestions(user_dict)
+        await refresh_match_index([user_dict])
         
-        return UserResponse(
-            success=True,
-            message="User registered successfully",
-            data=UserInDB(**user_dict)
-        )
+        return _user_response("User registered successfully", user_dict)
+    except PasswordPoolFull:
+        logger.warning("Registration rejected: password hashing pool full")
+        raise _hasher_busy()
     except Exception as e:
         logger.error(f"Registration error: {e}")
         raise HTTPException(status_code=500, detail="Registration failed")
 
 @router.post("/login", response_model=UserResponse)
-def login(credentials: UserLogin):
+async def login(credentials: UserLogin):
     """User login"""
     
     try:
-        user = users_collection.find_one({"email": credentials.email})
+        with span("auth.login.lookup"):
+            user = await async_users_collection.find_one({"email": credentials.email})
         if not user:
             raise HTTPException(status_code=401, detail="Invalid email or password")
         
-        if not pwd_context.verify(credentials.password, user["password_hash"]):
+        with span("auth.login.verify"):
+            verified = await password_hasher.verify(credentials.password, user["password_hash"])
+        if not verified:
             raise HTTPException(status_code=401, detail="Invalid email or password")
         
-        return UserResponse(
-            success=True,
-            message="Login successful",
-            data=UserInDB(**user)
-        )
+        # Transparently upgrade hashes made with an old bcrypt cost
+        if password_hasher.needs_rehash(user["password_hash"]):
+            try:
+                with span("auth.login.rehash"):
+                    new_hash = await password_hasher.hash(credentials.password)
+                await async_users_collection.update_one(
+                    {"_id": user["_id"], "password_hash": user["password_hash"]},
+                    {"$set": {"password_hash": new_hash}}
+                )
+                user["password_hash"] = new_hash
+            except Exception as e:
+                # Not fatal: the hash is upgraded on a later login
+                logger.warning(f"Password rehash skipped for {credentials.email}: {e}")
+        
+        return _user_response("Login successful", user)
     except HTTPException:
         raise
+    except PasswordPoolFull:
+        logger.warning("Login rejected: password hashing pool full")
+        raise _hasher_busy()
     except Exception as e:
         logger.error(f"Login error: {e}")
         raise HTTPException(status_code=500, detail="Login failed")
 
 
 @router.put("/profile/{user_id}", response_model=UserResponse)
-def update_profile(user_id: str, update: UserUpdate):
+async def update_profile(user_id: str, update: UserUpdate):
     """Update user profile"""
     
     try:
@@ -96,27 +146,68 @@ def update_profile(user_id: str, update: UserUpdate):
     
     # FAILURE POINT 2: User not found
     try:
-        user = users_collection.find_one({"_id": user_oid})
+        user = await async_users_collection.find_one({"_id": user_oid})
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
         update_dict = update.model_dump(exclude_unset=True)
         update_dict["updated_at"] = datetime.utcnow()
         
-        users_collection.update_one(
-            {"_id": user_oid},
-            {"$set": update_dict}
-        )
+        # Keep the integer token ids in step with the strings they encode
+        if "skills" in update_dict:
+            update_dict["skill_ids"] = await token_vocabulary.ids_for_async(update_dict["skills"])
+        if "interests" in update_dict:
+            update_dict["interest_ids"] = await token_vocabulary.ids_for_async(update_dict["interests"])
         
-        updated_user = users_collection.find_one({"_id": user_oid})
+        with span("auth.update_profile.write"):
+            await async_users_collection.update_one(
+                {"_id": user_oid},
+                {"$set": update_dict}
+            )
+            
+            updated_user = await async_users_collection.find_one({"_id": user_oid})
+        keyword_index.upsert_user(updated_user)
+        await invalidate_suggestions(updated_user)
+        await refresh_match_index([updated_user])
         
-        return UserResponse(
-            success=True,
-            message="Profile updated successfully",
-            data=UserInDB(**updated_user)
-        )
+        return _user_response("Profile updated successfully", updated_user)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Profile update error: {e}")
-        raise HTTPException(status_code=500, detail="Update failed")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Update failed")
+
+
+def _import_format(file: UploadFile, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt.lower()
+    name = (file.filename or "").lower()
+    if name.endswith(".csv") or file.content_type == "text/csv":
+        return "csv"
+    return "ndjson"
+
+
+@router.post("/import")
+async def import_users_file(file: UploadFile = File(...), format: Optional[str] = None):
+    """Bulk-register users from a CSV or NDJSON upload; returns a per-row error report"""
+    
+    fmt = _import_format(file, format)
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+    
+    # FAILURE POINT 1: another import is still hashing
+    if _import_lock.locked():
+        raise HTTPException(status_code=409, detail="An import is already running")
+    
+    # FAILURE POINT 2: unreadable upload or database failure mid-import
+    try:
+        async with _import_lock:
+            lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+            report = await import_users(read_records(lines, fmt))
+        logger.info(f"Bulk import: {report['inserted']}/{report['total']} users in {report['seconds']}s")
+        return report
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Upload must be UTF-8 text")
+    except Exception as e:
+        logger.error(f"Bulk import error: {e}")
+        raise HTTPException(status_code=500, detail="Import failed")
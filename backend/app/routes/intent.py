@@ -1,26 +1,40 @@
 # app/routes/intent.py
 from typing import List
 from fastapi import APIRouter, HTTPException
-from app.models.intent import IntentCreate, IntentUpdate, IntentInDB, IntentResponse
-from app.database import intents_collection, users_collection
-from app.services.parser import parse_intent
+from app.models.intent import (
+    IntentCreate, IntentUpdate, IntentInDB, IntentResponse,
+    IntentBatchItem, IntentBatchCreate, IntentBatchResult, IntentBatchResponse
+)
+from app.database import async_intents_collection, async_users_collection
+from app.services.parser import parse_intent, extract_keywords_batch
+from app.services.matcher import invalidate_suggestions, refresh_match_index
+from app.services.intent_expiry import active_intent_filter
+from app.services.suggestion_cache import suggestion_cache
+from app.services.vocabulary import token_vocabulary
 from app.config import settings
+from app.utils.fast_json import FastJSONResponse, intent_document
 from bson import ObjectId
 from datetime import datetime, timedelta
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Above this many distinct users a batch clears the suggestion cache
+# instead of re-scoring each user against every cached entry
+BATCH_INVALIDATE_LIMIT = 50
+
 
 @router.post("/submit", response_model=IntentResponse)
-def submit_intent(user_id: str, intent: IntentCreate):
+async def submit_intent(user_id: str, intent: IntentCreate):
     """Submit new intent"""
     
     # FAILURE POINT 1: Invalid user_id or user doesn't exist
     try:
         user_oid = ObjectId(user_id)
-        user = users_collection.find_one({"_id": user_oid})
+        user = await async_users_collection.find_one({"_id": user_oid})
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
     except Exception as e:
@@ -41,6 +55,7 @@ def submit_intent(user_id: str, intent: IntentCreate):
             "text": intent.text,
             "intent_type": intent.intent_type,
             "keywords": keywords,
+            "keyword_ids": await token_vocabulary.ids_for_async(keywords),
             "status": "ACTIVE",
             "keywords_auto_generated": True,
             "created_at": datetime.utcnow(),
@@ -48,9 +63,17 @@ def submit_intent(user_id: str, intent: IntentCreate):
             "expires_at": expires_at
         }
         
-        result = intents_collection.insert_one(intent_dict)
+        result = await async_intents_collection.insert_one(intent_dict)
         intent_dict["_id"] = result.inserted_id
+        await invalidate_suggestions(user)
+        await refresh_match_index([user])
         
+        if settings.fast_responses:
+            return FastJSONResponse({
+                "success": True,
+                "message": "Intent submitted successfully",
+                "data": intent_document(intent_dict)
+            })
         return IntentResponse(
             success=True,
             message="Intent submitted successfully",
@@ -61,8 +84,97 @@ def submit_intent(user_id: str, intent: IntentCreate):
         raise HTTPException(status_code=500, detail="Failed to submit intent")
 
 
+@router.post("/batch", response_model=IntentBatchResponse)
+async def submit_intents_batch(batch: IntentBatchCreate):
+    """Submit many intents at once: one user lookup, one parse pass, one insert"""
+    
+    results = {}
+    valid = []  # (index, item, user ObjectId)
+    
+    # FAILURE POINT 1: Invalid items (each fails on its own)
+    for index, raw in enumerate(batch.items):
+        try:
+            item = raw if isinstance(raw, IntentBatchItem) else IntentBatchItem(**raw)
+            valid.append((index, item, ObjectId(item.user_id)))
+        except ValidationError as e:
+            message = "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+            results[index] = IntentBatchResult(index=index, success=False, error=message)
+        except Exception:
+            results[index] = IntentBatchResult(index=index, success=False, error="Invalid user ID")
+    
+    try:
+        # FAILURE POINT 2: Unknown users, checked with a single $in query
+        user_ids = list({user_oid for _, _, user_oid in valid})
+        users = {}
+        if user_ids:
+            async for user in async_users_collection.find({"_id": {"$in": user_ids}}):
+                users[user["_id"]] = user
+        for index, _, user_oid in valid:
+            if user_oid not in users:
+                results[index] = IntentBatchResult(index=index, success=False, error="User not found")
+        valid = [entry for entry in valid if entry[2] in users]
+        
+        # One scanner pass over every text, then one unordered insert
+        keyword_lists = extract_keywords_batch([item.text for _, item, _ in valid])
+        now = datetime.utcnow()
+        expires_at = now + timedelta(hours=settings.intent_expiration_hours)
+        # Number every new keyword of the batch in one go; each item then
+        # reads its ids from the vocabulary cache
+        await token_vocabulary.ids_for_async({keyword for keywords in keyword_lists for keyword in keywords})
+        docs = []
+        for (_, item, user_oid), keywords in zip(valid, keyword_lists):
+            docs.append({
+                "user_id": user_oid,
+                "text": item.text,
+                "intent_type": item.intent_type,
+                "keywords": keywords,
+                "keyword_ids": token_vocabulary.cached_ids(keywords),
+                "status": "ACTIVE",
+                "keywords_auto_generated": True,
+                "created_at": now,
+                "updated_at": now,
+                "expires_at": expires_at
+            })
+        
+        failed_writes = {}
+        if docs:
+            try:
+                await async_intents_collection.insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    failed_writes[write_error["index"]] = write_error.get("errmsg", "Insert failed")
+        
+        touched = {}
+        for position, ((index, _, user_oid), doc) in enumerate(zip(valid, docs)):
+            if position in failed_writes:
+                results[index] = IntentBatchResult(index=index, success=False, error=failed_writes[position])
+            else:
+                results[index] = IntentBatchResult(index=index, success=True, intent_id=str(doc["_id"]))
+                touched[user_oid] = users[user_oid]
+        
+        if len(touched) > BATCH_INVALIDATE_LIMIT:
+            suggestion_cache.clear()
+        else:
+            for user in touched.values():
+                await invalidate_suggestions(user)
+        await refresh_match_index(list(touched.values()))
+    except Exception as e:
+        logger.error(f"Batch intent submission error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to submit intents")
+    
+    ordered = [results[index] for index in range(len(batch.items))]
+    submitted = sum(1 for result in ordered if result.success)
+    return IntentBatchResponse(
+        success=submitted > 0,
+        message=f"Submitted {submitted} of {len(ordered)} intents",
+        submitted=submitted,
+        failed=len(ordered) - submitted,
+        results=ordered
+    )
+
+
 @router.get("/{user_id}", response_model=List[IntentInDB])
-def get_user_intents(user_id: str):
+async def get_user_intents(user_id: str):
     """Get user's intents"""
     
     try:
@@ -71,10 +183,12 @@ def get_user_intents(user_id: str):
         raise HTTPException(status_code=400, detail="Invalid user ID")
     
     try:
-        intents = list(intents_collection.find(
-            {"user_id": user_oid, "status": "ACTIVE"}
-        ).sort("created_at", -1))
+        intents = await async_intents_collection.find(
+            {"user_id": user_oid, **active_intent_filter()}
+        ).sort("created_at", -1).to_list(None)
         
+        if settings.fast_responses:
+            return FastJSONResponse([intent_document(intent) for intent in intents])
         return [IntentInDB(**intent) for intent in intents]
     except Exception as e:
         logger.error(f"Get intents error: {e}")
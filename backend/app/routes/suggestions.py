@@ -1,15 +1,72 @@
 # app/routes/suggestions.py
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.models.suggestion import SuggestionBatchRequest
+from app.services.batch_suggestions import stream_suggestions
 from app.services.matcher import get_top_matches
+from app.services.suggestion_cache import suggestion_cache
+from app.utils.metrics import span
 from bson import ObjectId
 import logging
+import json
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+MAX_LIMIT = 10
+
+
+def suggestion_card(match: dict) -> dict:
+    """Public view of a match - NO NUMBERS, NO SCORES"""
+    
+    return {
+        "user_id": match["user_id"],
+        "name": match["name"],
+        "skills": match["skills"],
+        "interests": match["interests"],
+        "bio": match["bio"]
+        # Score is NOT included - hidden internally
+    }
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Suggestion cache counters (for sizing SUGGESTION_CACHE_SIZE / TTL)"""
+    
+    return suggestion_cache.stats()
+
+
+@router.post("/batch")
+async def get_batch_suggestions(payload: SuggestionBatchRequest):
+    """Suggestions for many users as NDJSON, one line per user in request order
+    
+    The candidate pool is loaded once for the whole batch; lines are sent as
+    each chunk of users is scored.
+    """
+    
+    # FAILURE POINT 1: Invalid user_id format (rejects the whole batch)
+    try:
+        user_oids = [ObjectId(user_id) for user_id in payload.user_ids]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid user ID")
+    limit = min(max(payload.limit, 1), MAX_LIMIT)
+    
+    async def lines():
+        # FAILURE POINT 2: Headers are already sent, so log and end the stream early
+        try:
+            async for user_oid, matches in stream_suggestions(user_oids, limit):
+                yield json.dumps({
+                    "user_id": str(user_oid),
+                    "suggestions": [suggestion_card(match) for match in matches]
+                }) + "\n"
+        except Exception as e:
+            logger.error(f"Batch suggestion stream aborted: {e}")
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 
 @router.get("/{user_id}")
-def get_suggestions(user_id: str, limit: int = 5):
+async def get_suggestions(user_id: str, limit: int = 5):
     """Get collaboration suggestions for user"""
     
     # FAILURE POINT 1: Invalid user_id format
@@ -21,12 +78,12 @@ def get_suggestions(user_id: str, limit: int = 5):
     
     # FAILURE POINT 2: Matching computation fails
     try:
-        if limit > 10:
-            limit = 10
+        if limit > MAX_LIMIT:
+            limit = MAX_LIMIT
         if limit < 1:
             limit = 5
         
-        matches = get_top_matches(str(user_oid), limit=limit)
+        matches = await get_top_matches(str(user_oid), limit=limit)
         
         if not matches:
             return {
@@ -36,17 +93,8 @@ def get_suggestions(user_id: str, limit: int = 5):
             }
         
         # Return as simple cards - NO NUMBERS, NO SCORES
-        suggestions = [
-            {
-                "user_id": match["user_id"],
-                "name": match["name"],
-                "skills": match["skills"],
-                "interests": match["interests"],
-                "bio": match["bio"]
-                # Score is NOT included - hidden internally
-            }
-            for match in matches
-        ]
+        with span("suggestions.serialize"):
+            suggestions = [suggestion_card(match) for match in matches]
         
         return {
             "success": True,
@@ -0,0 +1,323 @@
+# app/services/batch_scorer.py
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from itertools import chain
+import numpy as np
+import heapq
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Same weights as compute_compatibility in matcher.py
+SKILL_WEIGHT = 3
+INTEREST_WEIGHT = 2.5
+KEYWORD_WEIGHT = 2
+COMPLEMENT_WEIGHT = 1.5
+COMPLEMENT_BONUS = 15
+
+# Candidates scored per step of the top-k scan
+TOP_K_CHUNK = 256
+_BOUND_EPSILON = 1e-9
+
+_ROW_SHIFT = 32
+_TOKEN_MASK = (1 << _ROW_SHIFT) - 1
+
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    """np.unique via sort + neighbour compare (numpy 2.x's hash-based unique is slower here)"""
+
+    values = np.sort(values)
+    if len(values) == 0:
+        return values
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+class TokenMatrix:
+    """Sparse row-per-candidate encoding of one token field (deduplicated, CSR layout)
+
+    With a vocab dict, string tokens are numbered on the fly; without one the
+    rows already hold integer token ids (see app/services/vocabulary.py).
+    """
+
+    def __init__(self, rows: Sequence[Iterable], vocab: Optional[Dict] = None):
+        if vocab is None:
+            # Already integers: flatten without touching individual tokens
+            lengths = [len(row) if row else 0 for row in rows]
+            token_ids = np.fromiter(chain.from_iterable(row for row in rows if row),
+                                    dtype=np.int64, count=sum(lengths))
+        else:
+            token_ids = []
+            lengths = []
+            for row in rows:
+                ids = [vocab.setdefault(token, len(vocab)) for token in (row or [])]
+                token_ids.extend(ids)
+                lengths.append(len(ids))
+
+        self.n_rows = len(lengths)
+        row_of = np.repeat(np.arange(self.n_rows, dtype=np.int64), lengths)
+
+        # One sorted (row, token) key per distinct pair == per-row set semantics
+        keys = _sorted_unique((row_of << _ROW_SHIFT) | np.asarray(token_ids, dtype=np.int64))
+        self.row_ids = keys >> _ROW_SHIFT
+        self.token_ids = keys & _TOKEN_MASK
+        self.sizes = np.bincount(self.row_ids, minlength=self.n_rows)
+        self.indptr = np.concatenate(([0], np.cumsum(self.sizes)))
+        self.max_token = int(self.token_ids.max()) if len(self.token_ids) else -1
+        self._postings = None
+
+    @classmethod
+    def from_arrays(cls, row_ids: np.ndarray, token_ids: np.ndarray, sizes: np.ndarray, indptr: np.ndarray,
+                    postings: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> "TokenMatrix":
+        """Wrap already built arrays (e.g. views into a snapshot file) without copying them"""
+
+        matrix = cls.__new__(cls)
+        matrix.n_rows = len(sizes)
+        matrix.row_ids = row_ids
+        matrix.token_ids = token_ids
+        matrix.sizes = sizes
+        matrix.indptr = indptr
+        matrix.max_token = int(token_ids.max()) if len(token_ids) else -1
+        matrix._postings = postings
+        return matrix
+
+    def postings(self, vocab_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows ordered by token, per-token offsets into them): the inverted form"""
+
+        if self._postings is None or len(self._postings[1]) != vocab_size + 1:
+            order = np.argsort(self.token_ids, kind="stable")
+            counts = np.bincount(self.token_ids, minlength=vocab_size)
+            self._postings = (self.row_ids[order], np.concatenate(([0], np.cumsum(counts))))
+        return self._postings
+
+    def rows_with(self, token_ids: np.ndarray, vocab_size: int) -> np.ndarray:
+        """Rows containing any of the given tokens (inverted lookup, may repeat rows)"""
+
+        posting_rows, token_indptr = self.postings(vocab_size)
+        parts = [posting_rows[token_indptr[t]:token_indptr[t + 1]] for t in token_ids]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def _gather(self, rows: np.ndarray):
+        """(segment, token) pairs for a subset of rows"""
+
+        lengths = self.sizes[rows]
+        segment = np.repeat(np.arange(len(rows)), lengths)
+        starts = np.repeat(self.indptr[rows] - (np.cumsum(lengths) - lengths), lengths)
+        return segment, self.token_ids[starts + np.arange(lengths.sum())]
+
+    def overlap(self, token_mask: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Per-row count of tokens that are set in token_mask"""
+
+        if rows is None:
+            hits = token_mask[self.token_ids]
+            return np.bincount(self.row_ids, weights=hits, minlength=self.n_rows)
+
+        segment, tokens = self._gather(rows)
+        return np.bincount(segment, weights=token_mask[tokens], minlength=len(rows))
+
+
+class EncodedPool:
+    """Candidate pool encoded once into skill, interest and keyword matrices
+
+    encoded=False: candidates carry string `skills`/`interests`, numbered here.
+    encoded=True: candidates carry stored `skill_ids`/`interest_ids` and the
+    keywords are integer ids too, so no string hashing happens per request.
+    """
+
+    def __init__(self, candidates: Sequence[Dict], candidate_keywords: Sequence[Iterable],
+                 encoded: bool = False):
+        self.size = len(candidates)
+        if encoded:
+            self.vocab: Optional[Dict] = None
+            self.user_fields = ("skill_ids", "interest_ids")
+        else:
+            self.vocab = {}
+            self.user_fields = ("skills", "interests")
+        skill_field, interest_field = self.user_fields
+        self.skills = TokenMatrix([c.get(skill_field, []) for c in candidates], self.vocab)
+        self.interests = TokenMatrix([c.get(interest_field, []) for c in candidates], self.vocab)
+        self.keywords = TokenMatrix(candidate_keywords, self.vocab)
+        if encoded:
+            self.vocab_size = 1 + max(self.skills.max_token, self.interests.max_token, self.keywords.max_token)
+        else:
+            self.vocab_size = len(self.vocab)
+
+    @classmethod
+    def from_matrices(cls, skills: TokenMatrix, interests: TokenMatrix, keywords: TokenMatrix,
+                      vocab_size: int) -> "EncodedPool":
+        """Encoded (integer id) pool over prebuilt matrices, e.g. from a snapshot"""
+
+        pool = cls.__new__(cls)
+        pool.size = skills.n_rows
+        pool.vocab = None
+        pool.user_fields = ("skill_ids", "interest_ids")
+        pool.skills = skills
+        pool.interests = interests
+        pool.keywords = keywords
+        pool.vocab_size = vocab_size
+        return pool
+
+    def token_mask(self, tokens: Iterable) -> np.ndarray:
+        """Boolean vector over the vocabulary marking the given tokens"""
+
+        mask = np.zeros(self.vocab_size, dtype=bool)
+        if self.vocab is None:
+            ids = [token for token in tokens if 0 <= token < self.vocab_size]
+        else:
+            ids = [self.vocab[token] for token in tokens if token in self.vocab]
+        mask[ids] = True
+        return mask
+
+    def rows_sharing(self, token_ids: np.ndarray) -> np.ndarray:
+        """Sorted rows that share at least one token with `token_ids` in any field"""
+
+        vocab_size = self.vocab_size
+        parts = [matrix.rows_with(token_ids, vocab_size)
+                 for matrix in (self.skills, self.interests, self.keywords)]
+        return np.unique(np.concatenate(parts))
+
+
+def _overlap_score(overlap: np.ndarray, size_a: int, sizes_b: np.ndarray) -> np.ndarray:
+    """(overlap / max_len) * 100, evaluated exactly like the scalar version"""
+
+    denominator = np.maximum(size_a, sizes_b)
+    safe = np.where(denominator > 0, denominator, 1)
+    return (overlap / safe) * 100
+
+
+class PoolQuery:
+    """Requester-side token sets and vocabulary masks, prepared once per lookup"""
+
+    def __init__(self, user: Dict, user_keywords: List, pool: EncodedPool):
+        skill_field, interest_field = pool.user_fields
+        skills_a = set(user.get(skill_field, []))
+        interests_a = set(user.get(interest_field, []))
+        keywords_a = set(user_keywords)
+
+        self.pool = pool
+        self.skill_size = len(skills_a)
+        self.interest_size = len(interests_a)
+        self.keyword_size = len(keywords_a)
+        self.skill_mask = pool.token_mask(skills_a)
+        self.interest_mask = pool.token_mask(interests_a)
+        self.keyword_mask = pool.token_mask(keywords_a)
+        self.token_ids = np.flatnonzero(self.skill_mask | self.interest_mask | self.keyword_mask)
+
+    def components(self):
+        """(matrix, requester mask, requester size, weight) in scoring order"""
+
+        return (
+            (self.pool.skills, self.skill_mask, self.skill_size, SKILL_WEIGHT),
+            (self.pool.interests, self.interest_mask, self.interest_size, INTEREST_WEIGHT),
+            (self.pool.keywords, self.keyword_mask, self.keyword_size, KEYWORD_WEIGHT),
+        )
+
+
+def _score_rows(query: PoolQuery, rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """Exact scores for every candidate (or just `rows`) of the query's pool"""
+
+    pool = query.pool
+    n = pool.size if rows is None else len(rows)
+    score = np.zeros(n)
+    weights = np.zeros(n)
+
+    # Components are accumulated in the same order as compute_compatibility
+    # so the floating point results are bit-for-bit identical.
+    for matrix, mask, size_a, weight in query.components():
+        sizes_b = matrix.sizes if rows is None else matrix.sizes[rows]
+        applies = (size_a > 0) & (sizes_b > 0)
+        component = _overlap_score(matrix.overlap(mask, rows), size_a, sizes_b)
+        score = np.where(applies, score + component * weight, score)
+        weights = np.where(applies, weights + weight, weights)
+
+    # Complementary skills: requester has a skill the candidate wants to learn
+    if query.skill_size:
+        complement = pool.interests.overlap(query.skill_mask, rows) > 0
+        score = np.where(complement, score + COMPLEMENT_BONUS * COMPLEMENT_WEIGHT, score)
+        weights = np.where(complement, weights + COMPLEMENT_WEIGHT, weights)
+
+    final = np.divide(score, weights, out=np.zeros(n), where=weights > 0)
+    return np.minimum(final, 100)
+
+
+def score_pool(user: Dict, user_keywords: List[str], pool: EncodedPool,
+               rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """Compatibility of `user` against every candidate (or `rows`) in one pass"""
+
+    return _score_rows(PoolQuery(user, user_keywords, pool), rows)
+
+
+def upper_bounds(query: PoolQuery, rows: np.ndarray) -> np.ndarray:
+    """Best score each row could reach given only set sizes (overlap <= min length)"""
+
+    score = np.zeros(len(rows))
+    weights = np.zeros(len(rows))
+    for matrix, _, size_a, weight in query.components():
+        sizes_b = matrix.sizes[rows]
+        applies = (size_a > 0) & (sizes_b > 0)
+        best = _overlap_score(np.minimum(size_a, sizes_b), size_a, sizes_b)
+        score = np.where(applies, score + best * weight, score)
+        weights = np.where(applies, weights + weight, weights)
+
+    without_bonus = np.divide(score, weights, out=np.zeros(len(rows)), where=weights > 0)
+    if not query.skill_size:
+        return np.minimum(without_bonus, 100)
+
+    # The fixed bonus may raise or lower the average, so take the better case
+    complement_possible = query.pool.interests.sizes[rows] > 0
+    with_bonus = (score + COMPLEMENT_BONUS * COMPLEMENT_WEIGHT) / (weights + COMPLEMENT_WEIGHT)
+    bound = np.where(complement_possible, np.maximum(without_bonus, with_bonus), without_bonus)
+    return np.minimum(bound, 100)
+
+
+def top_k(user: Dict, user_keywords: List[str], pool: EncodedPool, k: int,
+          min_score: float = 0, masked: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+    """Best k (row, score) pairs scoring above min_score, best first.
+
+    Only rows sharing at least one token with the requester can score above
+    zero. Those are visited in decreasing upper-bound order and scored in
+    chunks; the scan stops once no remaining bound can beat the k-th best.
+    Ties keep pool order, like a stable sort of all scores would. Rows set
+    in `masked` (a boolean vector over the pool) are never scored.
+    """
+
+    if k <= 0 or pool.size == 0:
+        return []
+
+    query = PoolQuery(user, user_keywords, pool)
+    rows = pool.rows_sharing(query.token_ids)
+    if masked is not None:
+        rows = rows[~masked[rows]]
+    if len(rows) == 0:
+        return []
+
+    bounds = upper_bounds(query, rows)
+    keep = bounds + _BOUND_EPSILON > min_score
+    rows, bounds = rows[keep], bounds[keep]
+    order = np.lexsort((rows, -bounds))
+
+    heap: List[Tuple[float, int]] = []  # min-heap of (score, -row)
+    for start in range(0, len(order), TOP_K_CHUNK):
+        chunk = order[start:start + TOP_K_CHUNK]
+        if len(heap) == k and bounds[chunk[0]] + _BOUND_EPSILON < heap[0][0]:
+            break
+
+        chunk_rows = rows[chunk]
+        for row, score in zip(chunk_rows.tolist(), _score_rows(query, chunk_rows).tolist()):
+            if score <= min_score:
+                continue
+            item = (score, -row)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+    return [(-neg_row, score) for score, neg_row in sorted(heap, reverse=True)]
+
+
+def score_candidates(user: Dict, user_keywords: List[str], candidates: Sequence[Dict],
+                     candidate_keywords: Sequence[Iterable[str]]) -> np.ndarray:
+    """Encode a candidate pool and score it against `user`"""
+
+    return score_pool(user, user_keywords, EncodedPool(candidates, candidate_keywords))
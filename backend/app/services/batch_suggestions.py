@@ -0,0 +1,121 @@
+# app/services/batch_suggestions.py
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from bson import ObjectId
+from fastapi.concurrency import run_in_threadpool
+from app.database import async_matching_users_collection
+from app.services.batch_scorer import EncodedPool, top_k
+from app.services.candidates import CandidateRecord, load_candidates, load_display_fields
+from app.services.matcher import MIN_MATCH_SCORE, format_matches, load_intent_keywords
+from app.services.vocabulary import encode_user_fields
+from app.utils.metrics import span
+import logging
+
+logger = logging.getLogger(__name__)
+
+REQUESTER_CHUNK = 200  # Requesters per lookup, scoring hop and display fetch
+REQUESTER_PROJECTION = {"skills": 1, "interests": 1, "skill_ids": 1, "interest_ids": 1}
+
+
+class SuggestionPool:
+    """Every active candidate with their keyword ids, loaded and encoded once per run
+
+    Scores and tie order are the same as get_top_matches with the default
+    engine: same candidates in the same order, same keyword fallback.
+    """
+
+    def __init__(self, records: List[CandidateRecord], keyword_map: Dict[ObjectId, List[int]]):
+        self.records = records
+        self.position = {record._id: row for row, record in enumerate(records)}
+        self.keywords = [keyword_map.get(record._id) or record.interest_ids for record in records]
+        self.pool = EncodedPool(records, self.keywords, encoded=True)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    async def load(cls) -> "SuggestionPool":
+        with span("batch_suggestions.pool_load"):
+            records = await load_candidates({"is_deleted": False, "availability": "ACTIVE"})
+            keyword_map = await load_intent_keywords([record._id for record in records], encoded=True)
+        return cls(records, keyword_map)
+
+    def rank(self, user_id: ObjectId, user: Dict, keyword_ids: List[int], depth: int) -> List[Tuple[ObjectId, float]]:
+        """Top `depth` (candidate id, score) for one requester, never the requester itself"""
+
+        own_row = self.position.get(user_id)
+        ranked = top_k(user, keyword_ids, self.pool, depth + 1, min_score=MIN_MATCH_SCORE)
+        return [(self.records[row]._id, score) for row, score in ranked if row != own_row][:depth]
+
+    def rank_many(self, requesters: List[Tuple[ObjectId, Dict, List[int]]], depth: int) -> List[List[Tuple[ObjectId, float]]]:
+        return [self.rank(user_id, user, keyword_ids, depth) for user_id, user, keyword_ids in requesters]
+
+
+async def _requester_chunks(user_ids: Optional[List[ObjectId]]) -> AsyncIterator[List[Tuple[ObjectId, Optional[Dict]]]]:
+    """(user id, user document or None) in chunks; None = unknown, deleted or inactive"""
+
+    eligible = {"is_deleted": False, "availability": {"$ne": "INACTIVE"}}
+    if user_ids is None:
+        chunk = []
+        cursor = async_matching_users_collection.find(eligible, REQUESTER_PROJECTION).sort("_id", 1)
+        async for doc in cursor:
+            chunk.append((doc["_id"], doc))
+            if len(chunk) == REQUESTER_CHUNK:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        return
+
+    for start in range(0, len(user_ids), REQUESTER_CHUNK):
+        ids = user_ids[start:start + REQUESTER_CHUNK]
+        cursor = async_matching_users_collection.find({"_id": {"$in": ids}, **eligible}, REQUESTER_PROJECTION)
+        docs = {doc["_id"]: doc async for doc in cursor}
+        yield [(user_id, docs.get(user_id)) for user_id in ids]
+
+
+async def _scoring_inputs(pool: SuggestionPool, chunk: List[Tuple[ObjectId, Optional[Dict]]]) -> List[Tuple[ObjectId, Dict, List[int]]]:
+    """Requester-side token ids; pool members reuse the keywords loaded with the pool"""
+
+    outside = [user_id for user_id, doc in chunk if doc is not None and user_id not in pool.position]
+    keyword_map = await load_intent_keywords(outside, encoded=True) if outside else {}
+
+    inputs = []
+    for user_id, doc in chunk:
+        if doc is None:
+            continue
+        user = await encode_user_fields(doc)
+        row = pool.position.get(user_id)
+        keyword_ids = pool.keywords[row] if row is not None else (keyword_map.get(user_id) or user["interest_ids"])
+        inputs.append((user_id, user, keyword_ids))
+    return inputs
+
+
+async def stream_suggestions(user_ids: Optional[List[ObjectId]], limit: int,
+                             pool: Optional[SuggestionPool] = None) -> AsyncIterator[Tuple[ObjectId, List[Dict]]]:
+    """(user id, matches best first) for each requester, chunk by chunk as they finish
+
+    user_ids=None means every user that can get suggestions. One candidate
+    pool load for the whole run; unknown, deleted and inactive requesters
+    get an empty list, like GET /suggestions/{user_id}.
+    """
+
+    if pool is None:
+        pool = await SuggestionPool.load()
+    logger.info(f"Batch suggestions: pool of {len(pool)} candidates loaded")
+
+    async for chunk in _requester_chunks(user_ids):
+        inputs = await _scoring_inputs(pool, chunk)
+
+        # Scoring is CPU-bound: keep it off the event loop
+        with span("batch_suggestions.scoring"):
+            rankings = await run_in_threadpool(pool.rank_many, inputs, limit)
+        ranked_by_user = {user_id: ranked for (user_id, _, _), ranked in zip(inputs, rankings)}
+
+        # One display fetch for every suggested user in the chunk
+        with span("batch_suggestions.display_fetch"):
+            display = await load_display_fields(
+                list({candidate_id for ranked in rankings for candidate_id, _ in ranked})
+            )
+
+        for user_id, _ in chunk:
+            yield user_id, format_matches(ranked_by_user.get(user_id, []), display)
@@ -0,0 +1,123 @@
+# app/services/candidates.py
+from typing import Dict, Iterable, List, Optional, Tuple
+from bson import ObjectId
+from app.database import (
+    async_matching_users_collection, matching_users_collection, matching_intents_collection
+)
+from app.services.intent_expiry import active_intent_filter
+from app.services.vocabulary import token_vocabulary
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Scoring only looks at the stored token ids; everything else (password_hash,
+# bio, email, timestamps, the raw strings) stays on the server until the
+# final top-k is known
+CANDIDATE_PROJECTION = {"_id": 1, "skill_ids": 1, "interest_ids": 1}
+DISPLAY_PROJECTION = {"_id": 1, "name": 1, "bio": 1, "skills": 1, "interests": 1}
+_LEGACY_PROJECTION = {"_id": 1, "skills": 1, "interests": 1}
+
+
+class CandidateRecord:
+    """Compact matching-side view of a user document"""
+
+    __slots__ = ("_id", "skill_ids", "interest_ids")
+
+    def __init__(self, _id: ObjectId, skill_ids: List[int], interest_ids: List[int]):
+        self._id = _id
+        self.skill_ids = skill_ids
+        self.interest_ids = interest_ids
+
+    @classmethod
+    def from_doc(cls, doc: Dict) -> "CandidateRecord":
+        return cls(doc["_id"], doc.get("skill_ids") or [], doc.get("interest_ids") or [])
+
+    def get(self, field: str, default=None):
+        """Dict-style access so scorers written against user dicts accept records"""
+
+        return getattr(self, field, default)
+
+    def __getitem__(self, field: str):
+        try:
+            return getattr(self, field)
+        except AttributeError:
+            raise KeyError(field)
+
+
+async def load_candidates(query: Dict) -> List[CandidateRecord]:
+    """Stream projected user documents matching `query` into compact records, in _id order
+
+    The order is the scorer's tie-break (pool order), so it is explicit: the
+    pipeline engine, the shards and the snapshot all break ties by _id too.
+    """
+
+    records = []
+    legacy = []
+    async for doc in async_matching_users_collection.find(query, CANDIDATE_PROJECTION).sort("_id", 1):
+        if "skill_ids" not in doc or "interest_ids" not in doc:
+            legacy.append(len(records))
+        records.append(CandidateRecord.from_doc(doc))
+
+    if legacy:
+        await _encode_legacy([records[i] for i in legacy])
+    return records
+
+
+async def _encode_legacy(records: List[CandidateRecord]) -> None:
+    # Users written before token ids existed: encode from the strings until
+    # migrations/backfill_token_ids.py has run
+    logger.info(f"{len(records)} candidates without token ids, encoding on the fly")
+    by_id = {record._id: record for record in records}
+    cursor = async_matching_users_collection.find({"_id": {"$in": list(by_id)}}, _LEGACY_PROJECTION)
+    async for doc in cursor:
+        record = by_id[doc["_id"]]
+        record.skill_ids = await token_vocabulary.ids_for_async(doc.get("skills") or [])
+        record.interest_ids = await token_vocabulary.ids_for_async(doc.get("interests") or [])
+
+
+async def load_display_fields(user_ids: List[ObjectId], projection: Optional[Dict] = None) -> Dict[ObjectId, Dict]:
+    """Display fields for the final few users only, keyed by _id"""
+
+    if not user_ids:
+        return {}
+    cursor = async_matching_users_collection.find(
+        {"_id": {"$in": list(user_ids)}, "is_deleted": False},
+        projection or DISPLAY_PROJECTION
+    )
+    return {doc["_id"]: doc async for doc in cursor}
+
+
+def iter_candidate_fields(per_user: int) -> Iterable[Tuple[ObjectId, List[int], List[int], List[int]]]:
+    """(user id, skill ids, interest ids, keyword ids) for every active user (sync, for index builds)
+
+    Keyword ids come from the user's latest `per_user` active intents and are
+    empty for users without any.
+    """
+
+    keywords: Dict[ObjectId, List] = {}
+    pipeline = [
+        {"$match": active_intent_filter()},
+        {"$sort": {"created_at": -1}},
+        {"$group": {"_id": "$user_id", "keywords": {"$push": {"$ifNull": ["$keyword_ids", "$keywords"]}}}},
+        {"$project": {"keywords": {"$slice": ["$keywords", per_user]}}},
+    ]
+    for row in matching_intents_collection.aggregate(pipeline, allowDiskUse=True):
+        ids = []
+        for intent_keywords in row.get("keywords", []):
+            if intent_keywords and isinstance(intent_keywords[0], str):
+                intent_keywords = token_vocabulary.ids_for(intent_keywords)
+            ids.extend(intent_keywords or [])
+        keywords[row["_id"]] = ids
+
+    cursor = matching_users_collection.find(
+        {"is_deleted": False, "availability": "ACTIVE"},
+        {"skill_ids": 1, "interest_ids": 1, "skills": 1, "interests": 1}
+    )
+    for user in cursor:
+        skill_ids = user.get("skill_ids")
+        if skill_ids is None:
+            skill_ids = token_vocabulary.ids_for(user.get("skills") or [])
+        interest_ids = user.get("interest_ids")
+        if interest_ids is None:
+            interest_ids = token_vocabulary.ids_for(user.get("interests") or [])
+        yield user["_id"], skill_ids, interest_ids, keywords.get(user["_id"], [])
@@ -0,0 +1,268 @@
+# app/services/change_feed.py
+from typing import Dict, List, Optional, Set
+from bson import ObjectId
+from fastapi.concurrency import run_in_threadpool
+from pymongo.errors import OperationFailure, PyMongoError
+from app.config import settings
+from app.database import async_client, async_db, async_users_collection, matching_users_collection
+from app.services.candidates import iter_candidate_fields
+from app.services.keyword_index import keyword_index
+from app.services.lsh_index import lsh_index, iter_user_tokens
+from app.services.match_snapshot import match_snapshot
+from app.services.matcher import INTENTS_PER_USER, invalidate_suggestions, refresh_match_index
+from app.services.shard_pool import shard_pool
+from app.services.suggestion_cache import suggestion_cache
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+WATCHED_COLLECTIONS = ("users", "intents")
+RETRY_SECONDS = 5
+_NOT_REPLICA_SET = 40573  # $changeStream needs a replica set or sharded cluster
+_HISTORY_LOST = (280, 286)  # Resume point fell off the oplog
+
+# Only what the match state reads travels with each event
+_PIPELINE = [
+    {"$match": {
+        "ns.coll": {"$in": list(WATCHED_COLLECTIONS)},
+        "operationType": {"$in": ["insert", "update", "replace", "delete"]},
+    }},
+    {"$project": {
+        "operationType": 1, "ns": 1, "documentKey": 1, "clusterTime": 1,
+        "fullDocument._id": 1, "fullDocument.user_id": 1,
+        "fullDocument.skills": 1, "fullDocument.interests": 1,
+        "fullDocument.skill_ids": 1, "fullDocument.interest_ids": 1,
+        "fullDocument.is_deleted": 1, "fullDocument.availability": 1,
+    }},
+]
+USER_FIELDS = {"skills": 1, "interests": 1, "skill_ids": 1, "interest_ids": 1, "is_deleted": 1, "availability": 1}
+
+
+class ChangeFeed:
+    """Tails users/intents change streams into the in-process match state
+
+    Events are applied in batches through the same hooks the routes call
+    after their own writes (keyword index, suggestion cache, LSH index,
+    matching shards, snapshot overlay), using the current document, so
+    replaying an event is harmless. A process starts at the current
+    cluster time, fixed before its warm-up builds start so nothing written
+    during a build is missed. A mapped match snapshot is older than that:
+    the feed then rewinds to the cluster time recorded before the
+    snapshot's scan, so the writes since are replayed on top of it. A
+    dropped stream resumes from the last token it saw, and everything is
+    rebuilt if the oplog no longer reaches back far enough.
+    """
+
+    def __init__(self, batch_size: int, max_await_ms: int):
+        self.batch_size = max(1, batch_size)
+        self.max_await_ms = max_await_ms
+        self.events = 0
+        self.batches = 0
+        self.resyncs = 0
+        self.rewinds = 0
+        self.errors = 0
+        self.last_lag_seconds = 0.0
+        self._caught_up_at: Optional[float] = None
+        self._resume_token: Optional[Dict] = None
+        self._start_at = None
+        self._covered_from = None  # Cluster time from which every write has been applied
+        self._task = None
+
+    # ========== POSITION ==========
+
+    async def _start_now(self) -> None:
+        reply = await async_client.admin.command("ping")
+        self._start_from(reply.get("operationTime"))
+
+    def _start_from(self, operation_time) -> None:
+        self._resume_token, self._start_at, self._covered_from = None, operation_time, operation_time
+
+    def _snapshot_behind(self) -> bool:
+        """True when the match snapshot's scan predates what the stream has covered"""
+
+        if not match_snapshot.ready or self._covered_from is None:
+            return False
+        operation_time = match_snapshot.operation_time
+        return operation_time is None or operation_time < self._covered_from
+
+    async def _rewind(self) -> None:
+        operation_time = match_snapshot.operation_time
+        if operation_time is None:
+            # Built without a cluster time (older builder): rescan instead
+            await self.resync()
+            return
+        self.rewinds += 1
+        logger.info(f"Change feed rewinding to the match snapshot's scan ({operation_time})")
+        self._start_from(operation_time)
+
+    # ========== APPLY ==========
+
+    async def apply(self, changes: List[Dict]) -> None:
+        """Bring the match state up to date for every user a batch of events touches"""
+
+        users: Dict[ObjectId, Dict] = {}
+        removed: Set[ObjectId] = set()
+        intent_owners: Set[ObjectId] = set()
+        lost_intent = False
+
+        for change in changes:
+            document = change.get("fullDocument")
+            if change["ns"]["coll"] == "users":
+                user_id = change["documentKey"]["_id"]
+                if document is None:
+                    # Hard delete, or gone again before the lookup
+                    users.pop(user_id, None)
+                    removed.add(user_id)
+                else:
+                    removed.discard(user_id)
+                    users[user_id] = document
+            elif document is not None:
+                intent_owners.add(document["user_id"])
+            else:
+                # A deleted intent carries no owner: cached rankings may use it
+                lost_intent = True
+
+        # Intent writes change the owner's keywords: re-read the owners
+        missing = [user_id for user_id in intent_owners if user_id not in users and user_id not in removed]
+        if missing:
+            async for document in async_users_collection.find({"_id": {"$in": missing}}, USER_FIELDS):
+                users[document["_id"]] = document
+
+        for document in users.values():
+            keyword_index.upsert_user(document)
+            await invalidate_suggestions(document)
+        gone = [{"_id": user_id, "is_deleted": True} for user_id in removed]
+        for document in gone:
+            keyword_index.remove_user(document["_id"])
+            await invalidate_suggestions(document)
+        await refresh_match_index(list(users.values()) + gone)
+
+        if lost_intent:
+            suggestion_cache.clear()
+
+    async def resync(self) -> None:
+        """Full rebuild of whatever is built, for when the feed cannot resume"""
+
+        self.resyncs += 1
+        logger.warning("Change feed cannot resume, rebuilding in-process match state")
+        await self._start_now()
+        suggestion_cache.clear()
+        if keyword_index.ready:
+            await run_in_threadpool(keyword_index.build, matching_users_collection)
+        if lsh_index.ready:
+            await run_in_threadpool(lsh_index.build, iter_user_tokens(INTENTS_PER_USER))
+        if shard_pool.ready:
+            await run_in_threadpool(shard_pool.build, iter_candidate_fields(INTENTS_PER_USER))
+        if match_snapshot.ready:
+            # The overlay may be missing writes too: rescan into a private base
+            scan_started_at = time.time()
+            await run_in_threadpool(match_snapshot.rebuild, [
+                (user_id, skill_ids, interest_ids, keyword_ids or interest_ids)
+                for user_id, skill_ids, interest_ids, keyword_ids in iter_candidate_fields(INTENTS_PER_USER)
+            ], scan_started_at, self._start_at)
+
+    # ========== LOOP ==========
+
+    def _watch(self):
+        position = {"resume_after": self._resume_token} if self._resume_token else {}
+        if not position and self._start_at is not None:
+            position = {"start_at_operation_time": self._start_at}
+        return async_db.watch(
+            _PIPELINE, full_document="updateLookup", max_await_time_ms=self.max_await_ms,
+            batch_size=self.batch_size, **position
+        )
+
+    async def _tail(self) -> None:
+        async with self._watch() as stream:
+            batch = []
+            while stream.alive:
+                change = await stream.try_next()
+                if change is not None:
+                    batch.append(change)
+                    if len(batch) < self.batch_size:
+                        continue
+                if batch:
+                    await self.apply(batch)
+                    self.events += len(batch)
+                    self.batches += 1
+                    cluster_time = batch[-1].get("clusterTime")
+                    if cluster_time is not None:
+                        self.last_lag_seconds = max(0.0, time.time() - cluster_time.time)
+                    batch = []
+                if change is None:
+                    # Nothing left on the server: state reflects everything up to now
+                    self._caught_up_at = time.monotonic()
+                if stream.resume_token is not None:
+                    self._resume_token = stream.resume_token
+                if self._snapshot_behind():
+                    # A snapshot older than the stream was mapped: reopen further back
+                    return
+
+    async def _loop(self) -> None:
+        while True:
+            # FAILURE POINT: stream errors reconnect from the last applied token
+            try:
+                await self._tail()
+                if self._snapshot_behind():
+                    await self._rewind()
+                    continue
+            except OperationFailure as e:
+                if e.code == _NOT_REPLICA_SET:
+                    logger.error("Change feed disabled: MongoDB is not a replica set")
+                    return
+                self.errors += 1
+                if e.code in _HISTORY_LOST:
+                    await self.resync()
+                else:
+                    logger.error(f"Change feed failed, retrying: {e}")
+            except PyMongoError as e:
+                self.errors += 1
+                logger.error(f"Change feed failed, retrying: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Change feed apply failed, retrying: {e}")
+            await asyncio.sleep(RETRY_SECONDS)
+
+    async def start(self) -> None:
+        """Fix the stream position, then tail in the background (call before index builds)"""
+
+        if self._task is None:
+            await self._start_now()
+            self._caught_up_at = time.monotonic()
+            self._task = asyncio.create_task(self._loop())
+            logger.info("Change feed started")
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def staleness_seconds(self) -> float:
+        """Upper bound on how old the match state may be (time since the feed was last caught up)"""
+
+        if self._caught_up_at is None:
+            return 0.0
+        return time.monotonic() - self._caught_up_at
+
+    def stats(self) -> Dict:
+        return {
+            "running": int(self._task is not None and not self._task.done()),
+            "staleness_seconds": round(self.staleness_seconds(), 3),
+            "last_lag_seconds": round(self.last_lag_seconds, 3),
+            "events_total": self.events,
+            "batches_total": self.batches,
+            "resyncs_total": self.resyncs,
+            "rewinds_total": self.rewinds,
+            "errors_total": self.errors,
+        }
+
+
+change_feed = ChangeFeed(settings.change_feed_batch_size, settings.change_feed_max_await_ms)
@@ -0,0 +1,106 @@
+# app/services/intent_expiry.py
+from datetime import datetime
+from typing import Dict, Optional
+from app.config import settings
+from app.database import async_intents_collection, async_users_collection
+from app.services.suggestion_cache import suggestion_cache
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+OWNER_FIELDS = {"skills": 1, "interests": 1, "skill_ids": 1, "interest_ids": 1, "is_deleted": 1, "availability": 1}
+
+
+def active_intent_filter(now: Optional[datetime] = None) -> Dict:
+    """Intents that still count: ACTIVE and not past expires_at (even if not swept yet)"""
+
+    return {"status": "ACTIVE", "expires_at": {"$gt": now or datetime.utcnow()}}
+
+
+class IntentSweeper:
+    """Background task that moves expired ACTIVE intents to ARCHIVED in batches"""
+
+    def __init__(self, interval_seconds: int, batch_size: int):
+        self.interval_seconds = interval_seconds
+        self.batch_size = max(1, batch_size)
+        self.archived = 0
+        self.runs = 0
+        self.last_run_seconds = 0.0
+        self._task = None
+
+    async def sweep(self, now: Optional[datetime] = None) -> int:
+        """Archive everything expired as of `now`; returns the number of intents archived
+
+        The owners of each archived batch are pushed through refresh_match_index
+        so the LSH index, matching shards and snapshot overlay drop the
+        expired keywords too.
+        """
+
+        # matcher imports this module for active_intent_filter
+        from app.services.matcher import refresh_match_index
+
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        archived = 0
+        while True:
+            # Bounded batches keep each write (and its index updates) short
+            batch = await async_intents_collection.find(
+                {"status": "ACTIVE", "expires_at": {"$lte": now}}, {"_id": 1, "user_id": 1}
+            ).limit(self.batch_size).to_list(None)
+            if not batch:
+                break
+            result = await async_intents_collection.update_many(
+                {"_id": {"$in": [doc["_id"] for doc in batch]}, "status": "ACTIVE"},
+                {"$set": {"status": "ARCHIVED", "archived_at": now, "updated_at": now}}
+            )
+            archived += result.modified_count
+            if result.modified_count:
+                owners = list({doc["user_id"] for doc in batch})
+                users = await async_users_collection.find({"_id": {"$in": owners}}, OWNER_FIELDS).to_list(None)
+                await refresh_match_index(users)
+            if len(batch) < self.batch_size:
+                break
+
+        # Archived keywords may sit in cached rankings; sweeps are rare, so clear
+        if archived:
+            suggestion_cache.clear()
+            logger.info(f"Archived {archived} expired intents")
+        self.archived += archived
+        self.runs += 1
+        self.last_run_seconds = time.perf_counter() - started
+        return archived
+
+    async def _loop(self) -> None:
+        while True:
+            # FAILURE POINT: a failed sweep is retried on the next tick
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Intent sweep failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None and self.interval_seconds > 0:
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"Intent sweeper started (every {self.interval_seconds}s)")
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            "archived_total": self.archived,
+            "runs": self.runs,
+            "last_run_seconds": round(self.last_run_seconds, 4),
+        }
+
+
+intent_sweeper = IntentSweeper(settings.intent_sweep_interval_seconds, settings.intent_sweep_batch_size)
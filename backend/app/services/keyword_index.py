@@ -0,0 +1,99 @@
+# app/services/keyword_index.py
+from typing import Dict, Iterable, List, Set
+from bson import ObjectId
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_tokens(user: Dict) -> Set[str]:
+    """Lowercased skill + interest tokens for a user document"""
+
+    tokens = set()
+    for field in ("skills", "interests"):
+        for item in user.get(field, []) or []:
+            if isinstance(item, str):
+                tokens.add(item.lower())
+    return tokens
+
+
+class KeywordIndex:
+    """In-process inverted index: normalized token -> posting list of user ids"""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[ObjectId]] = {}
+        self._user_tokens: Dict[ObjectId, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.ready = False
+
+    def build(self, collection) -> int:
+        """Rebuild the index from every non-deleted user in the collection"""
+
+        postings: Dict[str, Set[ObjectId]] = {}
+        user_tokens: Dict[ObjectId, Set[str]] = {}
+
+        cursor = collection.find(
+            {"is_deleted": False},
+            {"skills": 1, "interests": 1}
+        )
+        for user in cursor:
+            tokens = normalize_tokens(user)
+            user_tokens[user["_id"]] = tokens
+            for token in tokens:
+                postings.setdefault(token, set()).add(user["_id"])
+
+        with self._lock:
+            self._postings = postings
+            self._user_tokens = user_tokens
+            self.ready = True
+
+        logger.info(f"Keyword index built: {len(user_tokens)} users, {len(postings)} tokens")
+        return len(user_tokens)
+
+    def ensure_built(self, collection) -> None:
+        """Build once; concurrent callers wait for the build already running"""
+
+        if self.ready:
+            return
+        with self._build_lock:
+            if not self.ready:
+                self.build(collection)
+
+    def upsert_user(self, user: Dict) -> None:
+        """Add or refresh one user's postings (removes them if soft-deleted)"""
+
+        user_id = user["_id"]
+        tokens = set() if user.get("is_deleted") else normalize_tokens(user)
+
+        with self._lock:
+            old_tokens = self._user_tokens.pop(user_id, set())
+            for token in old_tokens - tokens:
+                posting = self._postings.get(token)
+                if posting is not None:
+                    posting.discard(user_id)
+                    if not posting:
+                        del self._postings[token]
+            for token in tokens - old_tokens:
+                self._postings.setdefault(token, set()).add(user_id)
+            if tokens:
+                self._user_tokens[user_id] = tokens
+
+    def remove_user(self, user_id: ObjectId) -> None:
+        """Drop a user from every posting list"""
+
+        self.upsert_user({"_id": user_id, "is_deleted": True})
+
+    def lookup(self, keywords: Iterable[str]) -> Dict[ObjectId, List[str]]:
+        """Map each user sharing at least one keyword to the keywords they share"""
+
+        matches: Dict[ObjectId, List[str]] = {}
+        with self._lock:
+            for keyword in dict.fromkeys(keywords):
+                for user_id in self._postings.get(keyword, ()):
+                    matches.setdefault(user_id, []).append(keyword)
+        return matches
+
+
+keyword_index = KeywordIndex()
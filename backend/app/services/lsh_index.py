@@ -0,0 +1,159 @@
+# app/services/lsh_index.py
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+from bson import ObjectId
+from app.config import settings
+from app.services.candidates import iter_candidate_fields
+import numpy as np
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+_PRIME = (1 << 31) - 1  # Mersenne prime for the (a * x + b) mod p hash family
+_SEED = 1009  # Fixed: signatures must not change between builds
+BUILD_BATCH = 10000
+
+
+class MinHashLSH:
+    """In-process MinHash signatures in LSH band buckets: user id -> candidate ids.
+
+    A user's token set is the union of skill, interest and intent-keyword ids
+    (one id space, see app/services/vocabulary.py), so cross-field overlaps
+    such as a skill the other user lists as an interest collide too. Two
+    users share a bucket in some band with probability 1 - (1 - J^r)^b for
+    Jaccard similarity J, r rows per band and b bands. Only active,
+    non-deleted users are indexed.
+    """
+
+    def __init__(self, num_perm: int, bands: int):
+        if bands < 1 or num_perm % bands:
+            raise ValueError(f"LSH_NUM_PERM ({num_perm}) must be a multiple of LSH_BANDS ({bands})")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.RandomState(_SEED)
+        self._a = rng.randint(1, _PRIME, size=(num_perm, 1), dtype=np.int64)
+        self._b = rng.randint(0, _PRIME, size=(num_perm, 1), dtype=np.int64)
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(bands)]
+        self._keys: Dict[ObjectId, List[bytes]] = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def signatures(self, token_sets: Sequence[Iterable[int]]) -> np.ndarray:
+        """(len(token_sets), num_perm) MinHash matrix; empty sets get an all-_PRIME row"""
+
+        lengths = [len(tokens) for tokens in token_sets]
+        result = np.full((len(token_sets), self.num_perm), _PRIME, dtype=np.int64)
+        nonempty = [i for i, length in enumerate(lengths) if length]
+        if not nonempty:
+            return result
+        tokens = np.fromiter((t for i in nonempty for t in token_sets[i]), dtype=np.int64,
+                             count=sum(lengths[i] for i in nonempty))
+        hashes = (self._a * tokens + self._b) % _PRIME
+        starts = np.concatenate(([0], np.cumsum([lengths[i] for i in nonempty])[:-1]))
+        result[nonempty] = np.minimum.reduceat(hashes, starts, axis=1).T
+        return result
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def _insert(self, user_id: ObjectId, keys: List[bytes]) -> None:
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, set()).add(user_id)
+        self._keys[user_id] = keys
+
+    def _remove(self, user_id: ObjectId) -> None:
+        for band, key in enumerate(self._keys.pop(user_id, ())):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(user_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def build(self, users: Iterable[Tuple[ObjectId, Sequence[int]]]) -> int:
+        """Rebuild from (user id, token ids) pairs, signatures computed in batches"""
+
+        buckets: List[Dict[bytes, set]] = [{} for _ in range(self.bands)]
+        all_keys: Dict[ObjectId, List[bytes]] = {}
+        batch: List[Tuple[ObjectId, Sequence[int]]] = []
+
+        def flush():
+            for (user_id, _), signature in zip(batch, self.signatures([tokens for _, tokens in batch])):
+                keys = self._band_keys(signature)
+                for band, key in enumerate(keys):
+                    buckets[band].setdefault(key, set()).add(user_id)
+                all_keys[user_id] = keys
+            batch.clear()
+
+        for user_id, tokens in users:
+            if tokens:
+                batch.append((user_id, tokens))
+                if len(batch) == BUILD_BATCH:
+                    flush()
+        if batch:
+            flush()
+
+        with self._lock:
+            self._buckets = buckets
+            self._keys = all_keys
+            self.ready = True
+        logger.info(f"LSH index built: {len(all_keys)} users, {self.bands}x{self.rows} bands")
+        return len(all_keys)
+
+    def ensure_built(self, users_source) -> None:
+        """Build once from users_source() (a callable); concurrent callers wait"""
+
+        if self.ready:
+            return
+        with self._build_lock:
+            if not self.ready:
+                self.build(users_source())
+
+    def upsert(self, user_id: ObjectId, tokens: Sequence[int], eligible: bool = True) -> None:
+        """Re-bucket one user after a profile or intent write (drops them if not eligible)"""
+
+        keys = self._band_keys(self.signatures([tokens])[0]) if eligible and tokens else None
+        with self._lock:
+            self._remove(user_id)
+            if keys is not None:
+                self._insert(user_id, keys)
+
+    def query(self, tokens: Sequence[int], limit: int, exclude: ObjectId = None) -> List[ObjectId]:
+        """Up to `limit` users sharing a bucket, most shared bands first (ties by _id)"""
+
+        if not tokens:
+            return []
+        keys = self._band_keys(self.signatures([tokens])[0])
+        hits: Counter = Counter()
+        with self._lock:
+            for band, key in enumerate(keys):
+                bucket = self._buckets[band].get(key)
+                if bucket:
+                    hits.update(bucket)
+        hits.pop(exclude, None)
+        if len(hits) <= limit:
+            return sorted(hits)
+        ranked = sorted(hits.items(), key=lambda item: (-item[1], item[0]))
+        return [user_id for user_id, _ in ranked[:limit]]
+
+
+def token_set(skill_ids: Iterable[int], interest_ids: Iterable[int], keyword_ids: Iterable[int]) -> List[int]:
+    """The set a user is hashed on"""
+
+    return sorted(set(skill_ids or ()) | set(interest_ids or ()) | set(keyword_ids or ()))
+
+
+def iter_user_tokens(per_user: int) -> Iterable[Tuple[ObjectId, List[int]]]:
+    """(user id, token set) for every active user, with their latest active intents' keywords"""
+
+    for user_id, skill_ids, interest_ids, keyword_ids in iter_candidate_fields(per_user):
+        yield user_id, token_set(skill_ids, interest_ids, keyword_ids)
+
+
+lsh_index = MinHashLSH(settings.lsh_num_perm, settings.lsh_bands)
@@ -0,0 +1,419 @@
+# app/services/match_snapshot.py
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from bson import ObjectId, Timestamp
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.services.batch_scorer import EncodedPool, TokenMatrix
+from app.services.shard_pool import COMPACT_THRESHOLD, Shard, ShardRow, encode_rows
+import numpy as np
+import threading
+import asyncio
+import json
+import mmap
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# File layout: MAGIC | header length (uint64 LE) | JSON header | arrays.
+# Every array starts on an ALIGN boundary; header offsets are relative to
+# the first array. Arrays are little-endian int64 except `ids` (n x 12 bytes,
+# ObjectIds in ascending order).
+MAGIC = b"CCMATCH1"
+FORMAT_VERSION = 1
+ALIGN = 64
+FIELDS = ("skills", "interests", "keywords")
+MATRIX_ARRAYS = ("row_ids", "token_ids", "sizes", "indptr", "posting_rows", "token_indptr")
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def _encode_snapshot(rows: Iterable[ShardRow], scan_started_at: float,
+                     operation_time: Optional[Timestamp]) -> Tuple[Dict, List[Tuple[int, bytes]], int]:
+    """(header, [(file offset, bytes)], file size) for the snapshot of `rows`"""
+
+    rows = sorted(rows, key=lambda row: row[0])
+    pool = encode_rows(rows)
+    arrays = {"ids": np.frombuffer(b"".join(row[0].binary for row in rows), dtype=np.uint8).reshape(len(rows), 12)}
+    for field in FIELDS:
+        matrix: TokenMatrix = getattr(pool, field)
+        posting_rows, token_indptr = matrix.postings(pool.vocab_size)
+        for name, array in zip(MATRIX_ARRAYS, (matrix.row_ids, matrix.token_ids, matrix.sizes,
+                                               matrix.indptr, posting_rows, token_indptr)):
+            arrays[f"{field}.{name}"] = np.ascontiguousarray(array, dtype="<i8")
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset = _aligned(offset + array.nbytes)
+    header = {
+        "format": FORMAT_VERSION,
+        "users": len(rows),
+        "vocab_size": pool.vocab_size,
+        "scan_started_at": scan_started_at,
+        "operation_time": [operation_time.time, operation_time.inc] if operation_time is not None else None,
+        "built_at": datetime.utcnow().isoformat(),
+        "arrays": layout,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _aligned(len(MAGIC) + 8 + len(header_bytes))
+    parts = [(0, MAGIC + len(header_bytes).to_bytes(8, "little") + header_bytes)]
+    parts.extend((data_start + layout[name]["offset"], array.tobytes()) for name, array in arrays.items())
+    return header, parts, data_start + offset
+
+
+def write_snapshot(path: str, rows: Iterable[ShardRow], scan_started_at: float,
+                   operation_time: Optional[Timestamp] = None) -> Dict:
+    """Encode the candidate pool and publish it at `path` atomically; returns the header
+
+    `rows` are (user id, skill ids, interest ids, keyword ids) with the
+    keyword fallback already applied. scan_started_at is the wall-clock time
+    the rows were read from (before the scan began); operation_time is the
+    cluster time taken at that point, where a change feed picks up the
+    writes the scan may have missed (None outside a replica set).
+    """
+
+    header, parts, size = _encode_snapshot(rows, scan_started_at, operation_time)
+
+    # Written next to the target, then renamed over it: readers see the old
+    # file or the new one, never a partial one. Workers that still map the
+    # old file keep it alive until they let go of it.
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            for offset, data in parts:
+                f.seek(offset)
+                f.write(data)
+            f.truncate(size)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return header
+
+
+class MatchSnapshot:
+    """Read-only view of a snapshot file: numpy arrays straight on a shared mmap
+
+    Every worker that opens the same file shares its pages through the page
+    cache; nothing is decoded or copied at open time.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+
+        # FAILURE POINT: wrong or truncated file
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a match snapshot")
+        self._parse(self._mmap)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[ShardRow], scan_started_at: float,
+                  operation_time: Optional[Timestamp] = None) -> "MatchSnapshot":
+        """Same layout built in this process's memory instead of mapped (private to this worker)"""
+
+        _, parts, size = _encode_snapshot(rows, scan_started_at, operation_time)
+        buffer = bytearray(size)
+        for offset, data in parts:
+            buffer[offset:offset + len(data)] = data
+        snapshot = cls.__new__(cls)
+        snapshot._mmap = bytes(buffer)
+        snapshot.identity = None
+        snapshot._parse(snapshot._mmap)
+        return snapshot
+
+    def _parse(self, buffer) -> None:
+        header_length = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 8], "little")
+        self.header = json.loads(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + header_length])
+        if self.header["format"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported match snapshot format {self.header['format']}")
+        data_start = _aligned(len(MAGIC) + 8 + header_length)
+
+        arrays = {}
+        for name, spec in self.header["arrays"].items():
+            count = int(np.prod(spec["shape"]))
+            arrays[name] = np.frombuffer(
+                buffer, dtype=np.dtype(spec["dtype"]), count=count, offset=data_start + spec["offset"]
+            ).reshape(spec["shape"])
+
+        self.ids = arrays["ids"]
+        self._keys = self.ids.view("S12").ravel()  # Sorted: binary search by ObjectId bytes
+        matrices = []
+        for field in FIELDS:
+            row_ids, token_ids, sizes, indptr, posting_rows, token_indptr = (
+                arrays[f"{field}.{name}"] for name in MATRIX_ARRAYS
+            )
+            matrices.append(TokenMatrix.from_arrays(row_ids, token_ids, sizes, indptr, (posting_rows, token_indptr)))
+        self.pool = EncodedPool.from_matrices(*matrices, vocab_size=self.header["vocab_size"])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def scan_started_at(self) -> float:
+        return self.header["scan_started_at"]
+
+    @property
+    def operation_time(self) -> Optional[Timestamp]:
+        value = self.header.get("operation_time")
+        return Timestamp(*value) if value else None
+
+    def user_id(self, row: int) -> ObjectId:
+        return ObjectId(self.ids[row].tobytes())
+
+    def row_of(self, user_id: ObjectId) -> Optional[int]:
+        binary = user_id.binary
+        row = int(np.searchsorted(self._keys, binary))
+        if row < len(self.ids) and self.ids[row].tobytes() == binary:
+            return row
+        return None
+
+    def rows(self) -> Iterator[ShardRow]:
+        """Every row decoded back to (user id, skill ids, interest ids, keyword ids)"""
+
+        fields = [(matrix.token_ids.tolist(), matrix.indptr.tolist())
+                  for matrix in (self.pool.skills, self.pool.interests, self.pool.keywords)]
+        for row in range(len(self.ids)):
+            yield (self.user_id(row), *(tokens[indptr[row]:indptr[row + 1]] for tokens, indptr in fields))
+
+
+class SnapshotShard(Shard):
+    """Shard scoring against a mapped snapshot, with this worker's later writes on top
+
+    Never changed once published: upserted() returns a copy with the write
+    applied, so a query can keep scoring the shard it picked up while
+    writes swap in newer ones. compact() is a no-op because the base is
+    shared; SnapshotMatcher.fold() re-encodes base and overlay into a new
+    shard instead.
+    """
+
+    def __init__(self, snapshot: MatchSnapshot, removed: Iterable[int] = (),
+                 extra: Optional[Dict[ObjectId, ShardRow]] = None):
+        self.snapshot = snapshot
+        self.pool = snapshot.pool
+        self.removed = set(removed)
+        self.extra: Dict[ObjectId, ShardRow] = dict(extra or {})
+        self._masked: Optional[np.ndarray] = None
+        self._extra_ids: List[ObjectId] = []
+        self._extra_pool: Optional[EncodedPool] = None
+
+    @property
+    def overlay_size(self) -> int:
+        return len(self.removed) + len(self.extra)
+
+    def _id_at(self, row: int) -> ObjectId:
+        return self.snapshot.user_id(row)
+
+    def _row_of(self, user_id: ObjectId) -> Optional[int]:
+        return self.snapshot.row_of(user_id)
+
+    def compact(self) -> None:
+        pass
+
+    def upserted(self, row: ShardRow, eligible: bool) -> "SnapshotShard":
+        # O(overlay): SnapshotMatcher keeps the overlay under COMPACT_THRESHOLD
+        shard = SnapshotShard(self.snapshot, self.removed, self.extra)
+        shard.upsert(row, eligible)
+        return shard
+
+    def live_rows(self) -> Iterator[ShardRow]:
+        """Base rows not masked by the overlay, then the overlay's rows"""
+
+        removed = self.removed
+        for index, row in enumerate(self.snapshot.rows()):
+            if index not in removed:
+                yield row
+        yield from self.extra.values()
+
+
+class SnapshotMatcher:
+    """The published snapshot plus recent writes, swapped when a new file appears
+
+    maybe_reload() checks the file at most every `check_seconds` (one stat call).
+    Writes since the base's scan are logged with their time, and the ones
+    newer than a new snapshot's scan are re-applied on top of it after a
+    swap. Once the overlay reaches COMPACT_THRESHOLD rows it is folded into
+    a private copy of the base (fold_in_background), so queries and writes
+    stay cheap between publishes. The lock only guards swapping references:
+    mapping, re-encoding and scoring run outside it.
+    """
+
+    def __init__(self, path: str, check_seconds: int):
+        self.path = path
+        self.check_seconds = check_seconds
+        self.swaps = 0
+        self.folds = 0
+        self._shard: Optional[SnapshotShard] = None
+        # user id -> (row, eligible, wall time, write sequence number)
+        self._writes: Dict[ObjectId, Tuple[ShardRow, bool, float, int]] = {}
+        self._version = 0  # Sequence number of the latest write
+        self._file_identity = None  # Last published file looked at
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._fold: Optional[asyncio.Future] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._shard is not None
+
+    @property
+    def operation_time(self) -> Optional[Timestamp]:
+        """Cluster time of the scan behind the base being served"""
+
+        shard = self._shard
+        return shard.snapshot.operation_time if shard is not None else None
+
+    def __len__(self) -> int:
+        shard = self._shard
+        return len(shard) if shard is not None else 0
+
+    def open(self) -> bool:
+        """Map the current file if it is new (or nothing is mapped yet); True when swapped
+
+        Blocking (mmap and header parse): call off the event loop.
+        """
+
+        with self._open_lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return False
+            identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+            if identity == self._file_identity:
+                return False
+
+            snapshot = MatchSnapshot(self.path)
+            self._file_identity = identity
+            current = self._shard
+            if current is not None and snapshot.scan_started_at <= current.snapshot.scan_started_at:
+                # Already serving a newer scan (a resync rebuild)
+                return False
+            self._install(snapshot)
+            self.swaps += 1
+        logger.info(f"Match snapshot mapped: {len(snapshot)} users, built {snapshot.header['built_at']}")
+        return True
+
+    def rebuild(self, rows: Iterable[ShardRow], scan_started_at: float,
+                operation_time: Optional[Timestamp] = None) -> None:
+        """Replace the base with a fresh scan held in memory, for when writes may have been missed
+
+        Writes older than the scan are dropped with it; the next published
+        file with a later scan is mapped as usual.
+        """
+
+        with self._open_lock:
+            snapshot = MatchSnapshot.from_rows(rows, scan_started_at, operation_time)
+            self._install(snapshot)
+            self.swaps += 1
+        logger.info(f"Match snapshot rebuilt in memory: {len(snapshot)} users")
+
+    def fold(self) -> None:
+        """Re-encode the base with the overlay applied into a private base (blocking)
+
+        The new base keeps the original scan and cluster times, so the write
+        log, the change feed and the next published file handle it exactly
+        as before.
+        """
+
+        with self._open_lock:
+            with self._lock:
+                shard, version = self._shard, self._version
+            if shard is None or shard.overlay_size < COMPACT_THRESHOLD:
+                return
+            snapshot = MatchSnapshot.from_rows(
+                shard.live_rows(), shard.snapshot.scan_started_at, shard.snapshot.operation_time
+            )
+            # Every write up to `version` is in the new base already
+            self._install(snapshot, folded=version)
+            self.folds += 1
+        logger.info(f"Match snapshot overlay folded: {len(snapshot)} users")
+
+    def fold_in_background(self) -> None:
+        """fold() in the threadpool once the overlay is due (one fold at a time)"""
+
+        shard = self._shard
+        if shard is None or shard.overlay_size < COMPACT_THRESHOLD:
+            return
+        if self._fold is not None and not self._fold.done():
+            return
+        self._fold = asyncio.ensure_future(run_in_threadpool(self.fold))
+
+    def _install(self, snapshot: MatchSnapshot, folded: Optional[int] = None) -> None:
+        # Writes made after the new snapshot's scan began are not in it yet
+        # (for a fold: writes after the folded sequence number)
+        with self._lock:
+            writes, version = list(self._writes.values()), self._version
+        shard = SnapshotShard(snapshot)
+        for row, eligible, written_at, sequence in writes:
+            if (sequence > folded) if folded is not None else (written_at >= snapshot.scan_started_at):
+                shard.upsert(row, eligible)
+        with self._lock:
+            # Writes that landed while the shard was being built
+            for row, eligible, _, sequence in self._writes.values():
+                if sequence > version:
+                    shard.upsert(row, eligible)
+            self._writes = {
+                user_id: write for user_id, write in self._writes.items()
+                if write[2] >= snapshot.scan_started_at
+            }
+            self._shard = shard
+
+    def reload_due(self) -> bool:
+        return time.monotonic() - self._checked_at >= self.check_seconds
+
+    def maybe_reload(self) -> None:
+        if self.reload_due():
+            try:
+                self.open()
+            except Exception as e:
+                # Keep serving the mapped version; try again next interval
+                logger.error(f"Match snapshot reload failed: {e}")
+
+    def upsert(self, user_id: ObjectId, skill_ids: List[int], interest_ids: List[int],
+               keyword_ids: List[int], eligible: bool = True) -> None:
+        row = (user_id, skill_ids, interest_ids, keyword_ids or interest_ids)
+        with self._lock:
+            self._version += 1
+            self._writes[user_id] = (row, eligible, time.time(), self._version)
+            if self._shard is not None:
+                # Copy-on-write: queries still scoring the previous shard keep it
+                self._shard = self._shard.upserted(row, eligible)
+
+    def query(self, skill_ids: List[int], interest_ids: List[int], keyword_ids: List[int],
+              k: int, min_score: float, exclude: Optional[ObjectId] = None) -> List[Tuple[ObjectId, float]]:
+        """Top-k (user id, score), best first, ties by _id (CPU-bound: call off the event loop)"""
+
+        user = {"skill_ids": skill_ids, "interest_ids": interest_ids}
+        with self._lock:
+            shard = self._shard
+        return shard.query(user, keyword_ids, k, min_score, exclude)
+
+    def stats(self) -> Dict:
+        shard = self._shard
+        return {
+            "ready": int(shard is not None),
+            "users": len(shard) if shard is not None else 0,
+            "overlay": shard.overlay_size if shard is not None else 0,
+            "writes": len(self._writes),
+            "swaps": self.swaps,
+            "folds": self.folds,
+            "age_seconds": round(time.time() - shard.snapshot.scan_started_at, 1) if shard is not None else 0,
+        }
+
+
+match_snapshot = SnapshotMatcher(settings.match_snapshot_path, settings.match_snapshot_check_seconds)
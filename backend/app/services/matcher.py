@@ -1,11 +1,66 @@
 # app/services/matcher.py
-from typing import List, Dict
+from typing import List, Dict, Tuple
+from concurrent.futures.process import BrokenProcessPool
 from bson import ObjectId
-from app.database import users_collection, intents_collection
+from fastapi.concurrency import run_in_threadpool
+from app.database import (
+    async_intents_collection, async_matching_users_collection, async_matching_intents_collection
+)
+from app.config import settings
+from app.services.batch_scorer import EncodedPool, top_k
+from app.services.candidates import (
+    CandidateRecord, iter_candidate_fields, load_candidates, load_display_fields
+)
+from app.services.intent_expiry import active_intent_filter
+from app.services.lsh_index import lsh_index, token_set
+from app.services.match_snapshot import match_snapshot
+from app.services.pipeline_scorer import pipeline_top_matches
+from app.services.shard_pool import shard_pool
+from app.services.suggestion_cache import suggestion_cache
+from app.services.vocabulary import token_vocabulary, encode_user_fields
+from app.utils.metrics import span
 import logging
 
 logger = logging.getLogger(__name__)
 
+INTENTS_PER_USER = 3
+MIN_MATCH_SCORE = 20  # Only include if there's some compatibility
+SUGGESTION_DEPTH = 10  # Ranked matches kept per cached user (max route limit)
+
+
+async def load_intent_keywords(user_ids: List[ObjectId], per_user: int = INTENTS_PER_USER,
+                               encoded: bool = False, primary: bool = False) -> Dict[ObjectId, List]:
+    """Bulk-load keywords of each user's latest active intents (one query per chunk)
+
+    encoded=True returns stored integer keyword ids instead of strings;
+    intents written before ids existed are encoded on the fly. primary=True
+    bypasses the matching read preference (callers that must see their own write).
+    """
+    
+    keyword_map: Dict[ObjectId, List] = {}
+    collection = async_intents_collection if primary else async_matching_intents_collection
+    chunk_size = max(1, settings.matcher_chunk_size)
+    pushed = {"$ifNull": ["$keyword_ids", "$keywords"]} if encoded else "$keywords"
+    active = active_intent_filter()
+    
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        pipeline = [
+            {"$match": {"user_id": {"$in": chunk}, **active}},
+            {"$sort": {"created_at": -1}},
+            {"$group": {"_id": "$user_id", "keywords": {"$push": pushed}}},
+            {"$project": {"keywords": {"$slice": ["$keywords", per_user]}}},
+        ]
+        async for row in collection.aggregate(pipeline):
+            keywords = []
+            for intent_keywords in row.get("keywords", []):
+                if encoded and intent_keywords and isinstance(intent_keywords[0], str):
+                    intent_keywords = await token_vocabulary.ids_for_async(intent_keywords)
+                keywords.extend(intent_keywords or [])
+            keyword_map[row["_id"]] = keywords
+    
+    return keyword_map
+
 
 def compute_compatibility(user_a: Dict, user_b: Dict, keywords_a: List[str], keywords_b: List[str]) -> float:
     """Calculate hidden compatibility score (0-100) - NOT shown to user"""
@@ -61,14 +116,82 @@ def compute_compatibility(user_a: Dict, user_b: Dict, keywords_a: List[str], key
     return min(final_score, 100)
 
 
-def get_top_matches(user_id: str, limit: int = 5) -> List[Dict]:
+def rank_candidates(user: Dict, user_keywords: List[int], other_users: List[CandidateRecord],
+                    keyword_map: Dict[ObjectId, List[int]], depth: int) -> List[Tuple[CandidateRecord, float]]:
+    """CPU part of matching: dedupe, encode and select the top `depth` candidates
+
+    Works on integer token ids: `user` carries skill_ids/interest_ids and the
+    keywords are ids, exactly as stored next to the strings.
+    """
+    
+    seen_users = set()  # Track duplicates
+    candidates = []
+    candidate_keywords = []
+    for other in other_users:
+        # Skip duplicates
+        if other._id in seen_users:
+            continue
+        seen_users.add(other._id)
+        
+        other_keywords = keyword_map.get(other._id)
+        if not other_keywords:
+            other_keywords = other.interest_ids
+        
+        candidates.append(other)
+        candidate_keywords.append(other_keywords)
+    
+    # Bounded top-k over real contenders only (HIDDEN scores)
+    with span("get_top_matches.encode"):
+        pool = EncodedPool(candidates, candidate_keywords, encoded=True)
+    with span("get_top_matches.scoring"):
+        ranked = top_k(user, user_keywords, pool, depth, min_score=MIN_MATCH_SCORE)
+    
+    # Already best first
+    return [(candidates[row], score) for row, score in ranked]
+
+
+async def build_matches(ranked: List[Tuple[ObjectId, float]]) -> List[Dict]:
+    """Attach display fields, fetched for the ranked few only"""
+    
+    display = await load_display_fields([candidate_id for candidate_id, _ in ranked])
+    return format_matches(ranked, display)
+
+
+def format_matches(ranked: List[Tuple[ObjectId, float]], display: Dict[ObjectId, Dict]) -> List[Dict]:
+    """Match dicts for ranked ids, using already fetched display fields"""
+    
+    matches = []
+    for candidate_id, score in ranked:
+        doc = display.get(candidate_id)
+        if doc is None:
+            continue  # Deleted since the candidate fetch
+        matches.append({
+            "user_id": str(candidate_id),
+            "name": doc.get("name"),
+            "skills": doc.get("skills", []),
+            "interests": doc.get("interests", []),
+            "bio": doc.get("bio"),
+            "score": score  # HIDDEN from frontend
+        })
+    return matches
+
+
+async def get_top_matches(user_id: str, limit: int = 5) -> List[Dict]:
     """Get top matching users - INTERNALLY SORTED, no numbers shown"""
     
+    cached = suggestion_cache.get(user_id, limit)
+    if cached is not None:
+        return cached
+    cache_token = suggestion_cache.begin(user_id)
+    depth = max(limit, SUGGESTION_DEPTH)
+    
     # FAILURE POINT 1: Invalid user_id or user not found
     try:
-        user = users_collection.find_one(
-            {"_id": ObjectId(user_id), "is_deleted": False}
-        )
+        with span("get_top_matches.user_lookup"):
+            user = await async_matching_users_collection.find_one(
+                {"_id": ObjectId(user_id), "is_deleted": False},
+                {"skills": 1, "interests": 1, "skill_ids": 1, "interest_ids": 1, "availability": 1}
+            )
         if not user:
             logger.warning(f"User not found: {user_id}")
             return []
@@ -83,9 +206,11 @@ def get_top_matches(user_id: str, limit: int = 5) -> List[Dict]:
     
     # Get user's intent keywords
     try:
-        user_intents = list(intents_collection.find(
-            {"user_id": ObjectId(user_id), "status": "ACTIVE"}
-        ).sort("created_at", -1).limit(3))
+        with span("get_top_matches.user_intents"):
+            user_intents = await async_matching_intents_collection.find(
+                {"user_id": ObjectId(user_id), **active_intent_filter()},
+                {"keywords": 1}
+            ).sort("created_at", -1).limit(INTENTS_PER_USER).to_list(None)
         
         user_keywords = []
         for intent in user_intents:
@@ -99,59 +224,145 @@ def get_top_matches(user_id: str, limit: int = 5) -> List[Dict]:
         logger.error(f"Error fetching intents: {e}")
         user_keywords = user.get("interests", [])
     
-    matches = []
-    seen_users = set()  # Track duplicates
-    
     try:
-        # Get other users (exclude current user, exclude inactive)
-        other_users = list(users_collection.find(
-            {
+        if settings.matcher_engine == "pipeline":
+            # Scored server-side: only the top `depth` documents come back
+            with span("get_top_matches.pipeline"):
+                matches = await pipeline_top_matches(
+                    ObjectId(user_id), user, user_keywords, depth, MIN_MATCH_SCORE, INTENTS_PER_USER
+                )
+            suggestion_cache.put(user_id, cache_token, matches, depth, user, user_keywords)
+            return matches[:limit]
+        
+        # Requester side as ids too (a handful of cached dict lookups)
+        scoring_user = await encode_user_fields(user)
+        user_keyword_ids = await token_vocabulary.ids_for_async(user_keywords)
+        
+        ranked = None
+        if settings.matcher_engine == "sharded":
+            if shard_pool.ready:
+                # Every shard scores its slice in its own process; only ids and scores come back
+                try:
+                    with span("get_top_matches.shards"):
+                        ranked = await shard_pool.query(
+                            scoring_user["skill_ids"], scoring_user["interest_ids"], user_keyword_ids,
+                            depth, MIN_MATCH_SCORE, exclude=ObjectId(user_id)
+                        )
+                except BrokenProcessPool:
+                    # FAILURE POINT: a shard worker died mid-request; this request scans in-process too
+                    ranked = None
+                    shard_pool.rebuild_in_background(lambda: iter_candidate_fields(INTENTS_PER_USER))
+            else:
+                # Shards not loaded (yet, or a worker died): exact in-process scan meanwhile
+                shard_pool.rebuild_in_background(lambda: iter_candidate_fields(INTENTS_PER_USER))
+        elif settings.matcher_engine == "snapshot":
+            if match_snapshot.reload_due():
+                # Maps a newly published file, if any: keep the mmap off the event loop
+                await run_in_threadpool(match_snapshot.maybe_reload)
+            if match_snapshot.ready:
+                # Scored against the mapped pool: no candidate or intent reads at all
+                with span("get_top_matches.snapshot"):
+                    ranked = await run_in_threadpool(
+                        match_snapshot.query, scoring_user["skill_ids"], scoring_user["interest_ids"],
+                        user_keyword_ids, depth, MIN_MATCH_SCORE, ObjectId(user_id)
+                    )
+        
+        if ranked is None:
+            # Get other users (exclude current user, exclude inactive)
+            # Only the scoring fields travel; display fields come after ranking
+            candidate_query = {
                 "_id": {"$ne": ObjectId(user_id)},
                 "is_deleted": False,
                 "availability": "ACTIVE"  # Only active users
             }
-        ))
-        
-        for other in other_users:
-            other_id = str(other["_id"])
-            
-            # Skip duplicates
-            if other_id in seen_users:
-                continue
-            seen_users.add(other_id)
+            if settings.matcher_engine == "lsh" and lsh_index.ready:
+                # Approximate: only bucket-mates are fetched and scored exactly
+                with span("get_top_matches.lsh_candidates"):
+                    candidate_ids = lsh_index.query(
+                        token_set(scoring_user["skill_ids"], scoring_user["interest_ids"], user_keyword_ids),
+                        settings.lsh_max_candidates, exclude=ObjectId(user_id)
+                    )
+                candidate_query["_id"] = {"$in": candidate_ids}
+            with span("get_top_matches.candidate_fetch"):
+                other_users = await load_candidates(candidate_query)
             
-            # Get other user's intents
-            other_intents = list(intents_collection.find(
-                {"user_id": other["_id"], "status": "ACTIVE"}
-            ).limit(3))
+            # Candidate keywords in bulk instead of one query per candidate
+            with span("get_top_matches.candidate_intents"):
+                keyword_map = await load_intent_keywords([other._id for other in other_users], encoded=True)
             
-            other_keywords = []
-            for intent in other_intents:
-                other_keywords.extend(intent.get("keywords", []))
-            
-            if not other_keywords:
-                other_keywords = other.get("interests", [])
-            
-            # Compute score (HIDDEN)
-            score = compute_compatibility(user, other, user_keywords, other_keywords)
-            
-            # Only include if there's some compatibility
-            if score > 20:
-                matches.append({
-                    "user_id": other_id,
-                    "name": other.get("name"),
-                    "skills": other.get("skills", []),
-                    "interests": other.get("interests", []),
-                    "bio": other.get("bio"),
-                    "score": score  # HIDDEN from frontend
-                })
+            # Scoring is CPU-bound: keep it off the event loop
+            ranked = await run_in_threadpool(
+                rank_candidates, scoring_user, user_keyword_ids, other_users, keyword_map, depth
+            )
+            ranked = [(record._id, score) for record, score in ranked]
         
-        # INTERNALLY SORT by score (best first)
-        matches.sort(key=lambda x: x["score"], reverse=True)
+        with span("get_top_matches.display_fetch"):
+            matches = await build_matches(ranked)
         
-        # Return top matches
+        suggestion_cache.put(user_id, cache_token, matches, depth, user, user_keywords)
         return matches[:limit]
     
     except Exception as e:
         logger.error(f"Matching computation error: {e}")
-        return []
\ No newline at end of file
+        return []
+
+
+async def refresh_match_index(users: List[Dict]) -> None:
+    """Update the LSH index, matching shards and snapshot overlay after profile or intent writes
+
+    No-op for structures that are not built or mapped yet.
+    """
+    
+    if not (lsh_index.ready or shard_pool.ready or match_snapshot.ready) or not users:
+        return
+    
+    try:
+        keyword_map = await load_intent_keywords([user["_id"] for user in users], encoded=True, primary=True)
+        for user in users:
+            encoded = await encode_user_fields(user)
+            eligible = not user.get("is_deleted") and user.get("availability") == "ACTIVE"
+            keyword_ids = keyword_map.get(user["_id"]) or []
+            if lsh_index.ready:
+                lsh_index.upsert(
+                    user["_id"], token_set(encoded["skill_ids"], encoded["interest_ids"], keyword_ids), eligible
+                )
+            if shard_pool.ready:
+                await shard_pool.upsert(
+                    user["_id"], encoded["skill_ids"], encoded["interest_ids"], keyword_ids, eligible
+                )
+            if match_snapshot.ready:
+                match_snapshot.upsert(
+                    user["_id"], encoded["skill_ids"], encoded["interest_ids"], keyword_ids, eligible
+                )
+        if match_snapshot.ready:
+            # Keeps the overlay on top of the mapped base small
+            match_snapshot.fold_in_background()
+    except Exception as e:
+        # Not fatal: the user is updated on their next write or the next build
+        logger.error(f"Match index refresh failed: {e}")
+
+
+async def invalidate_suggestions(user: Dict) -> None:
+    """Drop cached suggestions that a write to this user's profile or intents can affect"""
+    
+    if not suggestion_cache.enabled:
+        return
+    
+    try:
+        # Runs right after a write: read it back from the primary
+        keyword_map = await load_intent_keywords([user["_id"]], primary=True)
+        keywords = keyword_map.get(user["_id"]) or user.get("interests", [])
+        eligible = not user.get("is_deleted") and user.get("availability") == "ACTIVE"
+        
+        # Re-scores the user against every cached requester: off the event loop
+        await run_in_threadpool(
+            suggestion_cache.invalidate_user,
+            user, keywords, eligible,
+            lambda requester, requester_keywords, other, other_keywords:
+                compute_compatibility(requester, other, requester_keywords, other_keywords),
+            MIN_MATCH_SCORE
+        )
+    except Exception as e:
+        # FAILURE POINT: never serve possibly stale suggestions
+        logger.error(f"Suggestion cache invalidation failed, clearing cache: {e}")
+        suggestion_cache.clear()
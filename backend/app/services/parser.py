@@ -1,6 +1,6 @@
 # app/services/parser.py
 import re
-from typing import List
+from typing import Dict, Iterable, List
 import logging
 
 logger = logging.getLogger(__name__)
@@ -31,6 +31,52 @@ _MULTI_WORD_KEYWORDS = sorted(
 )
 
 
+def _trie_pattern(node: dict) -> str:
+    """Regex for a character trie; greedy, so it always matches the longest phrase"""
+    
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in node.items() if ch != ""]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:  # a phrase ends here, longer ones are optional
+        return "(?:" + body + ")?"
+    return body
+
+
+def build_keyword_pattern(phrases: List[str]):
+    """Compile one single-pass scanner for phrases and single words.
+    
+    Every match is zero-width and happens at a position where a phrase or a
+    word starts: group 1 is the longest phrase starting there, group 2 the
+    word (same rule as re.findall(r'\\b[a-z]+\\b')). The returned map lists,
+    for each phrase, the phrases that are its prefixes (they occur too).
+    """
+    
+    trie: dict = {}
+    prefixes: Dict[str, List[str]] = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    
+    for phrase in phrases:
+        node = trie
+        prefixes[phrase] = []
+        for i, ch in enumerate(phrase):
+            node = node[ch]
+            if "" in node:
+                prefixes[phrase].append(phrase[:i + 1])
+    
+    phrase_regex = _trie_pattern(trie) if trie else "(?!)"
+    pattern = r"(?:(?=(" + phrase_regex + r"))|(?=\b[a-z]))(?=\b([a-z]+)\b)?"
+    return re.compile(pattern), prefixes
+
+
+_KEYWORD_PATTERN, _PHRASE_PREFIXES = build_keyword_pattern(_MULTI_WORD_KEYWORDS)
+_PHRASE_RANK = {phrase: rank for rank, phrase in enumerate(_MULTI_WORD_KEYWORDS)}
+
+
 def extract_keywords(text: str) -> List[str]:
     """Extract keywords from intent text"""
     
@@ -41,16 +87,19 @@ def extract_keywords(text: str) -> List[str]:
     
     try:
         lower_text = text.lower()
-        keywords = []
-
-        # Step 1: Match multi-word tech terms first (e.g. "machine learning")
-        for term in _MULTI_WORD_KEYWORDS:
-            if term in lower_text:
-                keywords.append(term)
-
-        # Step 2: Extract single words, filter stop words
-        words = re.findall(r'\b[a-z]+\b', lower_text)
-        keywords.extend(w for w in words if w not in STOP_WORDS and len(w) > 2)
+        phrases = set()
+        words = []
+        
+        # One scan finds multi-word tech terms and single words together
+        for phrase, word in _KEYWORD_PATTERN.findall(lower_text):
+            if phrase:
+                phrases.update(_PHRASE_PREFIXES[phrase])
+            if word and word not in STOP_WORDS and len(word) > 2:
+                words.append(word)
+        
+        # Multi-word terms first (in _MULTI_WORD_KEYWORDS order), then words
+        keywords = sorted(phrases, key=_PHRASE_RANK.__getitem__)
+        keywords.extend(words)
         
         # Return unique keywords (max 10 to avoid bloat)
         return list(dict.fromkeys(keywords))[:10]
@@ -61,6 +110,12 @@ def extract_keywords(text: str) -> List[str]:
         return []
 
 
+def extract_keywords_batch(texts: Iterable[str]) -> List[List[str]]:
+    """Extract keywords for many texts (bulk imports) with the shared compiled scanner"""
+    
+    return [extract_keywords(text) for text in texts]
+
+
 def parse_intent(text: str) -> dict:
     """Parse intent text and extract metadata"""
     
@@ -0,0 +1,106 @@
+# app/services/password_hasher.py
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from passlib.context import CryptContext
+from app.config import settings
+import multiprocessing
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# One context per cost factor, built lazily in whichever process needs it
+_contexts = {}
+
+
+def _context(rounds: int) -> CryptContext:
+    if rounds not in _contexts:
+        _contexts[rounds] = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    return _contexts[rounds]
+
+
+class PasswordPoolFull(Exception):
+    """Raised when the hashing pool already has its maximum of queued jobs"""
+
+
+def _hash_password(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+
+def hash_passwords(passwords: list, rounds: int) -> list:
+    """Many hashes in one worker task (pool entry point for bulk imports)"""
+
+    context = _context(rounds)
+    return [context.hash(password) for password in passwords]
+
+
+def _verify_password(password: str, hashed: str) -> bool:
+    return _context(settings.bcrypt_rounds).verify(password, hashed)
+
+
+def bcrypt_rounds(hashed: str) -> int:
+    """Cost factor encoded in a bcrypt hash ($2b$<rounds>$...)"""
+
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return -1
+
+
+class PasswordHasher:
+    """bcrypt in a dedicated, size-limited process pool with a queue-depth limit"""
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_limit)
+        self.in_flight = 0
+        self.rejected = 0
+        self._pool = None
+
+    def start(self) -> None:
+        if self._pool is None:
+            # spawn: workers must not inherit the parent's Mongo client threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Password hashing pool started ({self.workers} workers)")
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, fn, *args):
+        # FAILURE POINT: pool saturated -> fail fast instead of queueing forever
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise PasswordPoolFull()
+
+        self.start()
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, fn, *args)
+        except BrokenProcessPool:
+            # A worker died; replace the pool so later requests recover
+            logger.error("Password hashing pool broken, restarting it")
+            self.shutdown()
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash_password, password, settings.bcrypt_rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(_verify_password, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True when the stored hash was made with another cost factor or scheme"""
+
+        rounds = settings.bcrypt_rounds
+        return bcrypt_rounds(hashed) != rounds or _context(rounds).needs_update(hashed)
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_queue_limit)
@@ -0,0 +1,126 @@
+# app/services/pipeline_scorer.py
+from datetime import datetime
+from typing import Dict, List
+from bson import ObjectId
+from app.database import async_matching_users_collection
+from app.services.batch_scorer import (
+    SKILL_WEIGHT, INTEREST_WEIGHT, KEYWORD_WEIGHT, COMPLEMENT_WEIGHT, COMPLEMENT_BONUS
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _token_set(expression) -> Dict:
+    """Deduplicated array for a possibly missing field (set semantics like Python's set())"""
+
+    return {"$setUnion": [{"$ifNull": [expression, []]}, []]}
+
+
+def _overlap_component(field: str, tokens_a: List[str], weight: float) -> Dict:
+    """(score term, weight term) for one overlap, same arithmetic as compute_compatibility"""
+
+    size_b = {"$size": f"${field}"}
+    overlap = {"$size": {"$setIntersection": [f"${field}", tokens_a]}}
+    ratio = {"$divide": [overlap, {"$max": [len(tokens_a), size_b]}]}
+    applies = {"$gt": [size_b, 0]}
+    return (
+        {"$cond": [applies, {"$multiply": [{"$multiply": [ratio, 100]}, weight]}, 0]},
+        {"$cond": [applies, weight, 0]},
+    )
+
+
+def build_match_pipeline(user_id: ObjectId, user: Dict, user_keywords: List[str], depth: int,
+                         min_score: float, intents_per_user: int) -> List[Dict]:
+    """Aggregation on `users` that scores every active candidate server-side.
+
+    Terms are added in the same order and with the same operations as
+    compute_compatibility, so scores are identical doubles. Requester-side
+    sets are inlined as constants; terms that cannot apply are left out.
+    """
+
+    skills_a = sorted(set(user.get("skills", [])))
+    interests_a = sorted(set(user.get("interests", [])))
+    keywords_a = sorted(set(user_keywords))
+
+    score_terms = []
+    weight_terms = []
+    for field, tokens_a, weight in (
+        ("_skills", skills_a, SKILL_WEIGHT),
+        ("_interests", interests_a, INTEREST_WEIGHT),
+        ("_keywords", keywords_a, KEYWORD_WEIGHT),
+    ):
+        if tokens_a:
+            score_term, weight_term = _overlap_component(field, tokens_a, weight)
+            score_terms.append(score_term)
+            weight_terms.append(weight_term)
+
+    # Complementary skills: requester has a skill the candidate wants to learn
+    if skills_a:
+        complement = {"$gt": [{"$size": {"$setIntersection": ["$_interests", skills_a]}}, 0]}
+        score_terms.append({"$cond": [complement, COMPLEMENT_BONUS * COMPLEMENT_WEIGHT, 0]})
+        weight_terms.append({"$cond": [complement, COMPLEMENT_WEIGHT, 0]})
+
+    score = 0.0
+    weights = 0.0
+    for score_term, weight_term in zip(score_terms, weight_terms):
+        score = {"$add": [score, score_term]}
+        weights = {"$add": [weights, weight_term]}
+
+    return [
+        {"$match": {"_id": {"$ne": user_id}, "is_deleted": False, "availability": "ACTIVE"}},
+        # Keyword set of the latest active intents per candidate, collapsed to
+        # one small document inside the lookup (served by the user_id index)
+        {"$lookup": {
+            "from": "intents",
+            "let": {"uid": "$_id"},
+            "pipeline": [
+                {"$match": {
+                    "$expr": {"$eq": ["$user_id", "$$uid"]},
+                    "status": "ACTIVE",
+                    "expires_at": {"$gt": datetime.utcnow()},
+                }},
+                {"$sort": {"created_at": -1}},
+                {"$limit": intents_per_user},
+                {"$unwind": "$keywords"},
+                {"$group": {"_id": None, "keywords": {"$addToSet": "$keywords"}}},
+            ],
+            "as": "_intents",
+        }},
+        {"$addFields": {"_intent_keywords": {"$ifNull": [{"$arrayElemAt": ["$_intents.keywords", 0]}, []]}}},
+        {"$addFields": {
+            "_skills": _token_set("$skills"),
+            "_interests": _token_set("$interests"),
+            # No intent keywords -> fall back to interests, like the Python engine
+            "_keywords": _token_set({"$cond": [
+                {"$gt": [{"$size": "$_intent_keywords"}, 0]}, "$_intent_keywords", "$interests"
+            ]}),
+        }},
+        {"$addFields": {"_score": score, "_weights": weights}},
+        {"$addFields": {"_score": {"$cond": [
+            {"$eq": ["$_weights", 0]}, 0.0, {"$min": [{"$divide": ["$_score", "$_weights"]}, 100]}
+        ]}}},
+        {"$match": {"_score": {"$gt": min_score}}},
+        # Ties by _id, like the Python engine (its pool is loaded in _id order)
+        {"$sort": {"_score": -1, "_id": 1}},
+        {"$limit": depth},
+        {"$project": {"name": 1, "skills": 1, "interests": 1, "bio": 1, "_score": 1}},
+    ]
+
+
+async def pipeline_top_matches(user_id: ObjectId, user: Dict, user_keywords: List[str], depth: int,
+                               min_score: float, intents_per_user: int) -> List[Dict]:
+    """Top `depth` matches scored inside MongoDB; only those documents are transferred"""
+
+    pipeline = build_match_pipeline(user_id, user, user_keywords, depth, min_score, intents_per_user)
+    matches = []
+    async for doc in async_matching_users_collection.aggregate(pipeline, allowDiskUse=True):
+        matches.append({
+            "user_id": str(doc["_id"]),
+            "name": doc.get("name"),
+            "skills": doc.get("skills", []),
+            "interests": doc.get("interests", []),
+            "bio": doc.get("bio"),
+            "score": doc["_score"]  # HIDDEN from frontend
+        })
+    return matches
@@ -0,0 +1,270 @@
+# app/services/shard_pool.py
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from bson import ObjectId
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+from app.services.batch_scorer import EncodedPool, top_k
+import numpy as np
+import multiprocessing
+import threading
+import asyncio
+import heapq
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upserts a shard absorbs before it re-encodes its base pool in place
+COMPACT_THRESHOLD = 500
+
+# (user id, skill ids, interest ids, keyword ids); keyword ids already fall
+# back to the interest ids like rank_candidates does
+ShardRow = Tuple[ObjectId, List[int], List[int], List[int]]
+
+
+# ============================================
+# WORKER SIDE (runs inside each shard process)
+# ============================================
+
+class Shard:
+    """One worker's slice of the candidate pool, encoded once and kept in memory
+
+    Rows are held in _id order so ties resolve the same way in every shard
+    and in the merge. Upserts go to a small side pool (and mask the base
+    row) until COMPACT_THRESHOLD of them pile up, then the base is rebuilt.
+    """
+
+    def __init__(self, rows: Sequence[ShardRow]):
+        self._encode(sorted(rows, key=lambda row: row[0]))
+        self.extra: Dict[ObjectId, ShardRow] = {}
+        self._extra_ids: List[ObjectId] = []
+        self._extra_pool: Optional[EncodedPool] = None
+
+    def _encode(self, rows: List[ShardRow]) -> None:
+        self.rows = rows
+        self.position = {row[0]: index for index, row in enumerate(rows)}
+        self.removed = set()
+        self._masked: Optional[np.ndarray] = None
+        self.pool = encode_rows(rows)
+
+    def _id_at(self, row: int) -> ObjectId:
+        return self.rows[row][0]
+
+    def _row_of(self, user_id: ObjectId) -> Optional[int]:
+        return self.position.get(user_id)
+
+    def __len__(self) -> int:
+        return self.pool.size - len(self.removed) + len(self.extra)
+
+    def upsert(self, row: ShardRow, eligible: bool) -> None:
+        user_id = row[0]
+        base_row = self._row_of(user_id)
+        if base_row is not None:
+            self.removed.add(base_row)
+            self._masked = None
+        self.extra.pop(user_id, None)
+        if eligible:
+            self.extra[user_id] = row
+        self._extra_pool = None
+        if len(self.removed) + len(self.extra) >= COMPACT_THRESHOLD:
+            self.compact()
+
+    def compact(self) -> None:
+        live = [row for index, row in enumerate(self.rows) if index not in self.removed]
+        self._encode(sorted(live + list(self.extra.values()), key=lambda row: row[0]))
+        self.extra = {}
+        self._extra_pool = None
+
+    def query(self, user: Dict, keyword_ids: List[int], k: int, min_score: float,
+              exclude: Optional[ObjectId]) -> List[Tuple[ObjectId, float]]:
+        """Local top-k as (user id, score), best first, ties by _id"""
+
+        # Masked base rows are skipped during the scan; one extra row covers the excluded one
+        excluded_row = self._row_of(exclude) if exclude is not None else None
+        hits = [
+            (self._id_at(row), score)
+            for row, score in top_k(user, keyword_ids, self.pool, k + (excluded_row is not None),
+                                    min_score, self._masked_rows())
+            if row != excluded_row
+        ]
+        if self.extra:
+            if self._extra_pool is None:
+                self._extra_ids = sorted(self.extra)
+                self._extra_pool = encode_rows([self.extra[user_id] for user_id in self._extra_ids])
+            hits.extend(
+                (self._extra_ids[row], score)
+                for row, score in top_k(user, keyword_ids, self._extra_pool, k + 1, min_score)
+                if self._extra_ids[row] != exclude
+            )
+        return sorted(hits, key=_rank_key)[:k]
+
+
+    def _masked_rows(self) -> Optional[np.ndarray]:
+        if not self.removed:
+            return None
+        if self._masked is None:
+            masked = np.zeros(self.pool.size, dtype=bool)
+            masked[list(self.removed)] = True
+            self._masked = masked
+        return self._masked
+
+
+def encode_rows(rows: Sequence[ShardRow]) -> EncodedPool:
+    candidates = [{"skill_ids": skill_ids, "interest_ids": interest_ids} for _, skill_ids, interest_ids, _ in rows]
+    return EncodedPool(candidates, [keyword_ids for *_, keyword_ids in rows], encoded=True)
+
+
+def _rank_key(hit: Tuple[ObjectId, float]):
+    return -hit[1], hit[0]
+
+
+_shard: Optional[Shard] = None
+
+
+def _load_shard(rows: List[ShardRow]) -> int:
+    global _shard
+    _shard = Shard(rows)
+    return len(_shard)
+
+
+def _upsert_shard(row: ShardRow, eligible: bool) -> int:
+    _shard.upsert(row, eligible)
+    return len(_shard)
+
+
+def _query_shard(skill_ids: List[int], interest_ids: List[int], keyword_ids: List[int], k: int,
+                 min_score: float, exclude: Optional[ObjectId]) -> List[Tuple[ObjectId, float]]:
+    if _shard is None:
+        raise RuntimeError("Shard not loaded")
+    user = {"skill_ids": skill_ids, "interest_ids": interest_ids}
+    return _shard.query(user, keyword_ids, k, min_score, exclude)
+
+
+# ============================================
+# PARENT SIDE
+# ============================================
+
+class ShardedMatcher:
+    """Candidate pool split across long-lived worker processes, one shard each
+
+    The pool is shipped to the workers once per build; a request sends only
+    the requester's token ids, every worker returns its local top-k and the
+    parent merges them. Results equal the in-process engine's (same scores,
+    ties by _id).
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.ready = False
+        self.sizes: List[int] = []
+        self._owner: Dict[ObjectId, int] = {}
+        self._executors: List[ProcessPoolExecutor] = []
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._rebuild: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return sum(self.sizes)
+
+    def start(self) -> None:
+        if not self._executors:
+            # spawn: workers must not inherit the parent's Mongo client threads.
+            # One single-process executor per shard, so every call reaches the
+            # process that holds that shard.
+            context = multiprocessing.get_context("spawn")
+            self._executors = [
+                ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in range(self.workers)
+            ]
+            logger.info(f"Matching shard pool started ({self.workers} workers)")
+
+    def shutdown(self) -> None:
+        self.ready = False
+        for executor in self._executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors = []
+
+    def build(self, users: Iterable[ShardRow]) -> int:
+        """Deal users round-robin into shards and load every worker (blocking)"""
+
+        self.start()
+        shards: List[List[ShardRow]] = [[] for _ in range(self.workers)]
+        owner: Dict[ObjectId, int] = {}
+        for index, (user_id, skill_ids, interest_ids, keyword_ids) in enumerate(users):
+            shard = index % self.workers
+            shards[shard].append((user_id, skill_ids, interest_ids, keyword_ids or interest_ids))
+            owner[user_id] = shard
+
+        futures = [executor.submit(_load_shard, rows) for executor, rows in zip(self._executors, shards)]
+        sizes = [future.result() for future in futures]
+        with self._lock:
+            self._owner = owner
+            self.sizes = sizes
+            self.ready = True
+        logger.info(f"Matching shards loaded: {sum(sizes)} users in {self.workers} shards")
+        return sum(sizes)
+
+    def ensure_built(self, users_source) -> None:
+        """Build once from users_source() (a callable); concurrent callers wait"""
+
+        if self.ready:
+            return
+        with self._build_lock:
+            if not self.ready:
+                self.build(users_source())
+
+    def rebuild_in_background(self, users_source) -> None:
+        """Restart and reload the workers without blocking the caller (one rebuild at a time)"""
+
+        if self._rebuild is not None and not self._rebuild.done():
+            return
+        self._rebuild = asyncio.ensure_future(run_in_threadpool(self.ensure_built, users_source))
+
+    def _broken(self) -> None:
+        # A worker died and took its shard with it; callers fall back to the
+        # exact in-process scan until the shards are rebuilt
+        logger.error("Matching shard pool broken, restarting it on next use")
+        self.shutdown()
+
+    async def query(self, skill_ids: List[int], interest_ids: List[int], keyword_ids: List[int],
+                    k: int, min_score: float, exclude: Optional[ObjectId] = None) -> List[Tuple[ObjectId, float]]:
+        """Global top-k (user id, score), best first: every shard in parallel, then merged"""
+
+        loop = asyncio.get_running_loop()
+        try:
+            local = await asyncio.gather(*(
+                loop.run_in_executor(executor, _query_shard, skill_ids, interest_ids, keyword_ids,
+                                     k, min_score, exclude)
+                for executor in self._executors
+            ))
+        except BrokenProcessPool:
+            self._broken()
+            raise
+        return list(heapq.merge(*local, key=_rank_key))[:k]
+
+    async def upsert(self, user_id: ObjectId, skill_ids: List[int], interest_ids: List[int],
+                     keyword_ids: List[int], eligible: bool = True) -> None:
+        """Send one user's current fields to the shard that owns them (new users: smallest shard)"""
+
+        with self._lock:
+            shard = self._owner.get(user_id)
+            if shard is None:
+                if not eligible:
+                    return
+                shard = min(range(len(self.sizes)), key=self.sizes.__getitem__)
+                self._owner[user_id] = shard
+
+        row = (user_id, skill_ids, interest_ids, keyword_ids or interest_ids)
+        loop = asyncio.get_running_loop()
+        try:
+            self.sizes[shard] = await loop.run_in_executor(self._executors[shard], _upsert_shard, row, eligible)
+        except BrokenProcessPool:
+            self._broken()
+            raise
+
+    def stats(self) -> Dict[str, int]:
+        return {"workers": self.workers, "users": len(self), "ready": int(self.ready)}
+
+
+shard_pool = ShardedMatcher(settings.matcher_shard_workers)
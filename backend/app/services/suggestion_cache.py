@@ -0,0 +1,231 @@
+# app/services/suggestion_cache.py
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.config import settings
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CachedSuggestions:
+    """Ranked matches for one requester plus what is needed to re-check them"""
+
+    __slots__ = ("matches", "match_ids", "depth", "requester", "keywords", "tokens", "expires_at")
+
+    def __init__(self, matches: List[Dict], depth: int, requester: Dict, keywords: List[str], expires_at: float):
+        self.matches = matches
+        self.match_ids = {match["user_id"] for match in matches}
+        self.depth = depth
+        self.requester = {"skills": requester.get("skills", []), "interests": requester.get("interests", [])}
+        self.keywords = keywords
+        self.tokens = profile_tokens(self.requester, keywords)
+        self.expires_at = expires_at
+
+    def could_admit(self, score: float, min_score: float) -> bool:
+        """Would a candidate with this score change the ranked list?"""
+
+        if score <= min_score:
+            return False
+        if len(self.matches) < self.depth:
+            return True
+        return score >= self.matches[-1]["score"]
+
+
+def profile_tokens(user: Dict, keywords: Iterable[str]) -> frozenset:
+    """Skills, interests and keywords in one set: two users with none in common score 0"""
+
+    return frozenset(user.get("skills", []) or []) | frozenset(user.get("interests", []) or []) | frozenset(keywords or [])
+
+
+class SuggestionCache:
+    """LRU + TTL cache of per-user ranked matches, keyed by (user id, version)
+
+    Entries are also indexed by requester token and by listed user, so a
+    write only looks at the entries it can actually change.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, int], CachedSuggestions]" = OrderedDict()
+        self._by_token: Dict[str, Set[Tuple[str, int]]] = {}
+        self._by_match: Dict[str, Set[Tuple[str, int]]] = {}
+        self._versions: Dict[str, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    # Index upkeep: callers hold self._lock
+
+    def _add(self, key: Tuple[str, int], entry: CachedSuggestions) -> None:
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = entry
+        for token in entry.tokens:
+            self._by_token.setdefault(token, set()).add(key)
+        for match_id in entry.match_ids:
+            self._by_match.setdefault(match_id, set()).add(key)
+
+    def _drop(self, key: Tuple[str, int]) -> None:
+        entry = self._entries.pop(key)
+        for index, values in ((self._by_token, entry.tokens), (self._by_match, entry.match_ids)):
+            for value in values:
+                keys = index.get(value)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[value]
+
+    def begin(self, user_id: str) -> Tuple[int, int]:
+        """Snapshot (user version, write generation) before computing a miss"""
+
+        with self._lock:
+            return self._versions.get(user_id, 0), self._generation
+
+    def get(self, user_id: str, limit: int) -> Optional[List[Dict]]:
+        """Cached top-`limit` matches, or None on a miss"""
+
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            key = (user_id, self._versions.get(user_id, 0))
+            entry = self._entries.get(key)
+            if entry is None or limit > entry.depth:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._drop(key)
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return [dict(match) for match in entry.matches[:limit]]
+
+    def put(self, user_id: str, token: Tuple[int, int], matches: List[Dict], depth: int,
+            requester: Dict, keywords: List[str]) -> None:
+        """Store a freshly computed ranking unless a write raced with it"""
+
+        if not self.enabled:
+            return
+
+        version, generation = token
+        with self._lock:
+            if generation != self._generation:
+                return  # Inputs changed mid-computation; don't cache a stale ranking
+            key = (user_id, version)
+            self._add(key, CachedSuggestions(
+                [dict(match) for match in matches], depth, requester, keywords,
+                time.monotonic() + self.ttl_seconds
+            ))
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user: Dict, keywords: List[str], eligible: bool,
+                        score_fn, min_score: float) -> int:
+        """Drop exactly the entries a write to `user` can affect.
+
+        That is the user's own entry (via a version bump), entries that
+        currently list the user, and entries the user's new profile would
+        now enter. `score_fn(requester, keywords, user, user_keywords)`
+        scores the written user against a cached requester; only requesters
+        sharing a token with the user are scored, and outside the lock so
+        lookups are not held up.
+        """
+
+        user_id = str(user["_id"])
+
+        with self._lock:
+            self._generation += 1
+            old_version = self._versions.get(user_id, 0)
+            self._versions[user_id] = old_version + 1
+
+            # Own entry and entries listing the user: no scoring needed
+            direct = set(self._by_match.get(user_id, ()))
+            direct.add((user_id, old_version))
+            dropped = 0
+            for key in direct:
+                if key in self._entries:
+                    self._drop(key)
+                    dropped += 1
+
+            candidates = []
+            if eligible:
+                keys = set()
+                for token in profile_tokens(user, keywords):
+                    keys.update(self._by_token.get(token, ()))
+                candidates = [(key, self._entries[key]) for key in keys]
+
+        affected = [
+            (key, entry) for key, entry in candidates
+            if entry.could_admit(score_fn(entry.requester, entry.keywords, user, keywords), min_score)
+        ]
+
+        with self._lock:
+            for key, entry in affected:
+                # Same object only: an entry stored since then was computed
+                # after this write (older computations fail put's generation check)
+                if self._entries.get(key) is entry:
+                    self._drop(key)
+                    dropped += 1
+            self.invalidations += dropped
+
+        return dropped
+
+    def clear(self) -> None:
+        """Drop everything (fallback when a targeted invalidation fails)"""
+
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_token.clear()
+            self._by_match.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def cache_limits() -> Tuple[int, float]:
+    """(max entries, TTL) allowed by the matching read routing
+
+    Invalidation only guards against writes racing a computation: a ranking
+    read from a lagging secondary after the write's invalidation would be
+    cached as fresh. With non-primary matching reads an entry may live no
+    longer than MATCHING_MAX_STALENESS_SECONDS, and without that bound
+    nothing is cached.
+    """
+
+    size, ttl = settings.suggestion_cache_size, settings.suggestion_cache_ttl_seconds
+    if settings.matching_read_preference == "primary":
+        return size, ttl
+    if settings.matching_max_staleness_seconds > 0:
+        return size, min(ttl, settings.matching_max_staleness_seconds)
+    logger.warning("Suggestion cache disabled: matching reads may go to secondaries "
+                   "with no MATCHING_MAX_STALENESS_SECONDS bound")
+    return 0, ttl
+
+
+suggestion_cache = SuggestionCache(*cache_limits())
@@ -0,0 +1,231 @@
+# app/services/user_import.py
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from app.config import settings
+from app.database import async_users_collection
+from app.models.user import UserCreate
+from app.services.keyword_index import keyword_index
+from app.services.matcher import refresh_match_index
+from app.services.password_hasher import hash_passwords
+from app.services.suggestion_cache import suggestion_cache
+from app.services.vocabulary import token_vocabulary
+from app.utils.metrics import span
+import asyncio
+import csv
+import json
+import multiprocessing
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+LIST_SEPARATOR = ";"  # CSV skills/interests cells: "python;react"
+
+
+class ImportRowError(Exception):
+    """A row that could not be read (bad JSON, wrong shape)"""
+
+
+class ImportReport:
+    """Totals plus one entry per rejected row"""
+
+    def __init__(self):
+        self.total = 0
+        self.inserted = 0
+        self.errors: List[Dict] = []
+        self.started = time.perf_counter()
+
+    def fail(self, row: int, error: str, email: Any = None) -> None:
+        self.errors.append({"row": row, "email": email, "error": error})
+
+    def to_dict(self) -> Dict:
+        return {
+            "total": self.total,
+            "inserted": self.inserted,
+            "failed": len(self.errors),
+            "seconds": round(time.perf_counter() - self.started, 2),
+            "errors": sorted(self.errors, key=lambda e: e["row"]),
+        }
+
+
+# ============================================
+# READING
+# ============================================
+
+def _split_list(cell: Any) -> List[str]:
+    if not cell:
+        return []
+    return str(cell).split(LIST_SEPARATOR)
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """(row number, record) from CSV with a header row; list cells use ';'"""
+
+    for row_number, row in enumerate(csv.DictReader(lines), start=1):
+        record = {key.strip(): value for key, value in row.items() if key}
+        for field in ("skills", "interests"):
+            record[field] = _split_list(record.get(field))
+        if not record.get("bio"):
+            record["bio"] = None
+        yield row_number, record
+
+
+def read_ndjson(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """(row number, record) from one JSON object per line; blank lines are skipped"""
+
+    for row_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield row_number, ImportRowError("Invalid JSON")
+            continue
+        if not isinstance(record, dict):
+            yield row_number, ImportRowError("Expected a JSON object")
+            continue
+        yield row_number, record
+
+
+def read_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Any]]:
+    if fmt == "csv":
+        return read_csv(lines)
+    if fmt == "ndjson":
+        return read_ndjson(lines)
+    raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'record'}: {e['msg']}" for e in error.errors()
+    )
+
+
+def _batches(records: Iterator, size: int) -> Iterator[List]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ============================================
+# IMPORT
+# ============================================
+
+async def _hash_all(passwords: List[str], executor: ProcessPoolExecutor, workers: int) -> List[str]:
+    """bcrypt every password, spread over all workers in a few tasks each"""
+
+    if not passwords:
+        return []
+    loop = asyncio.get_running_loop()
+    chunk = max(1, -(-len(passwords) // (workers * 4)))
+    tasks = [
+        loop.run_in_executor(executor, hash_passwords, passwords[i:i + chunk], settings.bcrypt_rounds)
+        for i in range(0, len(passwords), chunk)
+    ]
+    hashes = []
+    for part in await asyncio.gather(*tasks):
+        hashes.extend(part)
+    return hashes
+
+
+async def _insert(docs: List[Dict], rows: List[int], report: ImportReport) -> List[Dict]:
+    """Unordered insert; the unique email index rejects duplicates row by row"""
+
+    failed = set()
+    try:
+        await async_users_collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        for write_error in e.details.get("writeErrors", []):
+            index = write_error["index"]
+            failed.add(index)
+            if write_error.get("code") == DUPLICATE_KEY:
+                report.fail(rows[index], "Email already registered", docs[index]["email"])
+            else:
+                report.fail(rows[index], write_error.get("errmsg", "Insert failed"), docs[index]["email"])
+    return [doc for i, doc in enumerate(docs) if i not in failed]
+
+
+async def import_users(records: Iterable[Tuple[int, Any]], batch_size: Optional[int] = None,
+                       workers: Optional[int] = None) -> Dict:
+    """Validate, hash (in parallel) and insert users batch by batch; returns the report"""
+
+    batch_size = max(1, batch_size or settings.import_batch_size)
+    workers = workers or settings.import_hash_workers or os.cpu_count() or 1
+    report = ImportReport()
+
+    # Own pool sized for the machine, so an import never queues behind
+    # (or starves) the login/register hashing pool
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        for batch in _batches(iter(records), batch_size):
+            report.total += len(batch)
+            with span("import.validate"):
+                valid: List[Tuple[int, UserCreate]] = []
+                for row, record in batch:
+                    if isinstance(record, ImportRowError):
+                        report.fail(row, str(record))
+                        continue
+                    try:
+                        valid.append((row, UserCreate(**record)))
+                    except ValidationError as e:
+                        report.fail(row, _validation_message(e), record.get("email"))
+                    except TypeError:
+                        report.fail(row, "Unexpected record shape", record.get("email"))
+
+                # Known emails: skip the bcrypt work; the index still has the final say
+                emails = [user.email for _, user in valid]
+                existing = set()
+                async for doc in async_users_collection.find({"email": {"$in": emails}}, {"email": 1}):
+                    existing.add(doc["email"])
+                for row, user in valid:
+                    if user.email in existing:
+                        report.fail(row, "Email already registered", user.email)
+                valid = [(row, user) for row, user in valid if user.email not in existing]
+
+            with span("import.hash"):
+                hashes = await _hash_all([user.password for _, user in valid], executor, workers)
+
+            now = datetime.utcnow()
+            docs = []
+            for (row, user), password_hash in zip(valid, hashes):
+                docs.append({
+                    "email": user.email,
+                    "password_hash": password_hash,
+                    "name": user.name,
+                    "skills": user.skills,
+                    "interests": user.interests,
+                    "skill_ids": await token_vocabulary.ids_for_async(user.skills),
+                    "interest_ids": await token_vocabulary.ids_for_async(user.interests),
+                    "bio": user.bio,
+                    "availability": "ACTIVE",
+                    "is_deleted": False,
+                    "created_at": now,
+                    "updated_at": now
+                })
+            if not docs:
+                continue
+
+            with span("import.insert"):
+                inserted = await _insert(docs, [row for row, _ in valid], report)
+            report.inserted += len(inserted)
+            for doc in inserted:
+                keyword_index.upsert_user(doc)
+            await refresh_match_index(inserted)
+            logger.info(f"Import progress: {report.inserted}/{report.total} inserted")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    # New candidates can enter anyone's top-k; one clear beats per-user rescoring
+    if report.inserted:
+        suggestion_cache.clear()
+    return report.to_dict()
@@ -0,0 +1,119 @@
+# app/services/vocabulary.py
+from typing import Dict, Iterable, List
+from fastapi.concurrency import run_in_threadpool
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from app.database import vocabulary_collection, counters_collection
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Stored next to the raw strings they encode
+TOKEN_ID_FIELDS = {"skills": "skill_ids", "interests": "interest_ids", "keywords": "keyword_ids"}
+
+
+class TokenVocabulary:
+    """Global token -> integer id map, persisted in the `vocabulary` collection.
+
+    Tokens are the strings exactly as stored (skills/interests are already
+    stripped by the models, keywords lowercased by the parser), so comparing
+    ids gives the same result as comparing the strings. Ids never change once
+    assigned, which makes the in-process cache safe to share between requests.
+    """
+
+    def __init__(self, collection, counters):
+        self._collection = collection
+        self._counters = counters
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def load(self) -> int:
+        """Warm the cache with every assigned id"""
+
+        ids = {doc["token"]: doc["_id"] for doc in self._collection.find({}, {"token": 1})}
+        with self._lock:
+            self._ids.update(ids)
+        logger.info(f"Token vocabulary loaded: {len(ids)} tokens")
+        return len(ids)
+
+    def cached_ids(self, tokens: Iterable) -> List[int]:
+        """Sorted distinct ids, or None if any token has no id in the cache yet"""
+
+        ids = set()
+        for token in tokens:
+            if not isinstance(token, str):
+                continue
+            token_id = self._ids.get(token)
+            if token_id is None:
+                return None
+            ids.add(token_id)
+        return sorted(ids)
+
+    def ids_for(self, tokens: Iterable) -> List[int]:
+        """Sorted distinct ids for the tokens, assigning new ids where needed"""
+
+        tokens = [token for token in tokens or [] if isinstance(token, str)]
+        ids = self.cached_ids(tokens)
+        if ids is not None:
+            return ids
+
+        missing = [token for token in dict.fromkeys(tokens) if token not in self._ids]
+        self._assign(missing)
+        return sorted({self._ids[token] for token in tokens})
+
+    async def ids_for_async(self, tokens: Iterable) -> List[int]:
+        """ids_for without blocking the event loop when a new token needs an id"""
+
+        tokens = [token for token in tokens or [] if isinstance(token, str)]
+        ids = self.cached_ids(tokens)
+        if ids is not None:
+            return ids
+        return await run_in_threadpool(self.ids_for, tokens)
+
+    def _assign(self, tokens: List[str]) -> None:
+        # Another process may already have numbered some of them
+        self._remember(self._collection.find({"token": {"$in": tokens}}))
+        new = [token for token in tokens if token not in self._ids]
+        if not new:
+            return
+
+        # Reserve a contiguous block of ids in one atomic increment
+        counter = self._counters.find_one_and_update(
+            {"_id": "vocabulary"},
+            {"$inc": {"seq": len(new)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        first = counter["seq"] - len(new)
+        docs = [{"_id": first + i, "token": token} for i, token in enumerate(new)]
+        try:
+            self._collection.insert_many(docs, ordered=False)
+        except BulkWriteError:
+            # FAILURE POINT: lost a race on some tokens (unique index) -> use the winner's id
+            logger.info("Token vocabulary insert raced with another writer, re-reading")
+        self._remember(self._collection.find({"token": {"$in": new}}))
+
+    def _remember(self, docs) -> None:
+        with self._lock:
+            for doc in docs:
+                self._ids[doc["token"]] = doc["_id"]
+
+
+async def encode_user_fields(user: Dict) -> Dict[str, List[int]]:
+    """skill_ids/interest_ids for a user document, from storage when present"""
+
+    encoded = {}
+    for field in ("skills", "interests"):
+        id_field = TOKEN_ID_FIELDS[field]
+        stored = user.get(id_field)
+        if stored is None:
+            stored = await token_vocabulary.ids_for_async(user.get(field) or [])
+        encoded[id_field] = stored
+    return encoded
+
+
+token_vocabulary = TokenVocabulary(vocabulary_collection, counters_collection)
@@ -0,0 +1,62 @@
+# app/utils/fast_json.py
+from typing import Any, Dict
+from bson import ObjectId
+from fastapi.responses import Response
+import orjson
+
+# Field order and defaults mirror UserInDB / IntentInDB, so the bytes match
+# what response_model validation would have produced
+USER_FIELDS = ("email", "name", "skills", "interests", "bio")
+INTENT_FIELDS = ("text", "intent_type", "keywords")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """JSON bytes; datetime, enums and ObjectId are handled by the encoder"""
+
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(Response):
+    """JSON response for trusted DB documents: no model validation, no jsonable_encoder.
+
+    Returning one from a route with a response_model keeps the model in the
+    OpenAPI schema while skipping its runtime validation.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def user_document(doc: Dict) -> Dict:
+    """Users collection document shaped like UserInDB (aliased _id, no password hash)"""
+
+    out = {"_id": doc["_id"]}
+    for field in USER_FIELDS:
+        out[field] = doc.get(field)
+    out["availability"] = doc.get("availability", "ACTIVE")
+    out["is_deleted"] = doc.get("is_deleted", False)
+    out["created_at"] = doc["created_at"]
+    out["updated_at"] = doc["updated_at"]
+    return out
+
+
+def intent_document(doc: Dict) -> Dict:
+    """Intents collection document shaped like IntentInDB"""
+
+    out = {"_id": doc["_id"], "user_id": doc["user_id"]}
+    for field in INTENT_FIELDS:
+        out[field] = doc.get(field)
+    out["status"] = doc.get("status", "ACTIVE")
+    out["keywords_auto_generated"] = doc.get("keywords_auto_generated", True)
+    out["created_at"] = doc["created_at"]
+    out["updated_at"] = doc["updated_at"]
+    out["expires_at"] = doc["expires_at"]
+    return out
@@ -0,0 +1,71 @@
+# benchmarks/bench_candidate_memory.py
+"""Bytes on the wire and memory per candidate: full user documents vs projected records.
+
+Usage: python benchmarks/bench_candidate_memory.py [--users 100000] [--seed 7]
+Needs no database: documents are generated by seeds/generate_data.py, encoded to
+BSON (what the server sends) and decoded again (what the driver builds).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId, encode, decode
+from app.services.candidates import CandidateRecord, CANDIDATE_PROJECTION
+from seeds.generate_data import generate_users
+import argparse
+import bcrypt
+import gc
+import tracemalloc
+
+
+def project(doc: dict, projection: dict) -> dict:
+    return {field: doc[field] for field in projection if field in doc}
+
+
+def measure(payloads: list, build) -> int:
+    """Bytes still allocated after decoding every payload and keeping build(doc)"""
+
+    gc.collect()
+    tracemalloc.start()
+    kept = [build(decode(payload)) for payload in payloads]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Candidate record size report")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    password_hash = bcrypt.hashpw(b"pass1234", bcrypt.gensalt()).decode("utf-8")
+    vocab = {}
+    docs = []
+    for doc in generate_users(args.users, args.seed, password_hash):
+        doc["_id"] = ObjectId()
+        # Same shape as stored token ids, numbered locally (no database needed)
+        doc["skill_ids"] = sorted({vocab.setdefault(t, len(vocab)) for t in doc["skills"]})
+        doc["interest_ids"] = sorted({vocab.setdefault(t, len(vocab)) for t in doc["interests"]})
+        docs.append(doc)
+
+    full = [encode(doc) for doc in docs]
+    projected = [encode(project(doc, CANDIDATE_PROJECTION)) for doc in docs]
+    n = len(docs)
+
+    full_bytes = sum(len(b) for b in full)
+    projected_bytes = sum(len(b) for b in projected)
+    full_memory = measure(full, lambda doc: doc)
+    record_memory = measure(projected, CandidateRecord.from_doc)
+
+    print(f"candidates={n}")
+    print(f"{'':<24}{'full dict':>14}{'record':>14}{'ratio':>8}")
+    print(f"{'wire bytes/candidate':<24}{full_bytes / n:>14.1f}{projected_bytes / n:>14.1f}"
+          f"{projected_bytes / full_bytes:>8.2f}")
+    print(f"{'memory bytes/candidate':<24}{full_memory / n:>14.1f}{record_memory / n:>14.1f}"
+          f"{record_memory / full_memory:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
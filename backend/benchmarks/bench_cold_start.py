@@ -0,0 +1,96 @@
+# benchmarks/bench_cold_start.py
+"""Worker cold start: fresh process -> app imported -> lifespan entered -> first response.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 10] [--in-memory] [--output cold.json]
+
+Each run is a new interpreter (like a freshly spawned uvicorn worker). Reported
+per stage: `import` (import app.main, which imports every route and service),
+`ready` (lifespan startup finished, i.e. the worker would accept traffic) and
+`first_response` (GET /health answered). All times are from process start of
+the measured code, not including interpreter boot. Against an unreachable
+MONGO_URI this also shows whether startup blocks on the server.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import statistics
+import subprocess
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child(in_memory: bool) -> None:
+    """One cold start, measured from inside the new process; prints JSON"""
+
+    started = time.perf_counter()
+    if in_memory:
+        from benchmarks.run_benchmarks import _use_in_memory_database
+        _use_in_memory_database()
+
+    import asyncio
+    import logging
+    logging.disable(logging.CRITICAL)
+    import httpx
+    from app.main import app
+    imported = time.perf_counter()
+
+    async def start():
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://worker") as client:
+                response = await client.get("/health")
+            answered = time.perf_counter()
+            return ready, answered, response.status_code
+
+    ready, answered, status = asyncio.run(start())
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "ready_ms": (ready - started) * 1000,
+        "first_response_ms": (answered - started) * 1000,
+        "status": status,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker cold start benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock instead of mongod")
+    parser.add_argument("--output", help="write the summary as JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.in_memory)
+        return
+
+    command = [sys.executable, os.path.abspath(__file__), "--child"]
+    if args.in_memory:
+        command.append("--in-memory")
+
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.run(command, cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    summary = {"runs": args.runs, "database": "mongomock" if args.in_memory else "mongod"}
+    for stage in ("import_ms", "ready_ms", "first_response_ms"):
+        values = sorted(sample[stage] for sample in samples)
+        summary[stage] = {
+            "median": round(statistics.median(values), 1),
+            "max": round(values[-1], 1),
+        }
+        print(f"{stage:<18} median={summary[stage]['median']:>8.1f}ms  max={summary[stage]['max']:>8.1f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
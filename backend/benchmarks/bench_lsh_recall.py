@@ -0,0 +1,118 @@
+# benchmarks/bench_lsh_recall.py
+"""Recall@k and latency of the MinHash/LSH engine against the exact Python engine.
+
+Usage:
+    python benchmarks/bench_lsh_recall.py [--users 20000] [--requesters 200] [--limit 10]
+                                          [--num-perm 64] [--bands 32] [--max-candidates 500]
+                                          [--in-memory]
+Run it once per LSH shape to compare configurations.
+
+Runs against MONGO_URI using a throwaway database (BENCH_DATABASE_NAME), or a
+mongomock stand-in with --in-memory. For every requester both engines rank
+the same data; reported:
+  recall@k        share of the exact top-k user ids the LSH engine also returns
+  score recall@k  share of the exact top-k scores matched (ties are interchangeable)
+  candidates      users scored exactly per LSH call (the exact engine scores all of them)
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+import argparse
+import asyncio
+import statistics
+import time
+
+
+async def ranking(get_top_matches, settings, engine: str, user_id: str, limit: int):
+    settings.matcher_engine = engine
+    started = time.perf_counter()
+    matches = await get_top_matches(user_id, limit=limit)
+    return [(m["user_id"], m["score"]) for m in matches], time.perf_counter() - started
+
+
+def score_recall(expected: list, actual: list) -> float:
+    """Matched exact scores, position-free: equal scores count as the same result"""
+
+    remaining = [round(score, 9) for _, score in actual]
+    hits = 0
+    for _, score in expected:
+        score = round(score, 9)
+        if score in remaining:
+            remaining.remove(score)
+            hits += 1
+    return hits / len(expected)
+
+
+async def main(args) -> None:
+    from app.config import settings
+    from app.database import users_collection
+    from app.services.lsh_index import lsh_index, iter_user_tokens
+    from app.services.matcher import get_top_matches, INTENTS_PER_USER
+    from seeds.generate_data import seed_synthetic
+
+    if args.users:
+        seed_synthetic(args.users, seed=args.seed)
+    requesters = [str(doc["_id"]) for doc in users_collection.find(
+        {"is_deleted": False, "availability": "ACTIVE"}, {"_id": 1}
+    ).limit(args.requesters)]
+
+    # Exact rankings once; every LSH configuration is compared against them
+    exact = {}
+    exact_seconds = []
+    for user_id in requesters:
+        exact[user_id], seconds = await ranking(get_top_matches, settings, "python", user_id, args.limit)
+        exact_seconds.append(seconds)
+    print(f"exact     mean={statistics.mean(exact_seconds) * 1000:8.1f}ms per call")
+
+    started = time.perf_counter()
+    tokens = dict(iter_user_tokens(INTENTS_PER_USER))
+    lsh_index.build(tokens.items())
+    build_seconds = time.perf_counter() - started
+
+    recalls, score_recalls, lsh_seconds, candidates = [], [], [], []
+    for user_id in requesters:
+        expected = exact[user_id]
+        if not expected:
+            continue
+        actual, seconds = await ranking(get_top_matches, settings, "lsh", user_id, args.limit)
+        expected_ids = {uid for uid, _ in expected}
+        recalls.append(len(expected_ids & {uid for uid, _ in actual}) / len(expected))
+        score_recalls.append(score_recall(expected, actual))
+        lsh_seconds.append(seconds)
+        user_oid = ObjectId(user_id)
+        candidates.append(len(lsh_index.query(tokens.get(user_oid, []), settings.lsh_max_candidates, user_oid)))
+
+    print(f"lsh       mean={statistics.mean(lsh_seconds) * 1000:8.1f}ms per call  "
+          f"(num_perm={settings.lsh_num_perm} bands={settings.lsh_bands} "
+          f"max_candidates={settings.lsh_max_candidates}, build {build_seconds:.1f}s, {len(lsh_index)} users)")
+    print(f"recall@{args.limit}={statistics.mean(recalls):.3f}  "
+          f"score recall@{args.limit}={statistics.mean(score_recalls):.3f}  "
+          f"candidates scored={statistics.mean(candidates):.0f} of {len(tokens)}  "
+          f"over {len(recalls)} requesters with matches")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LSH engine recall@k vs exact matching")
+    parser.add_argument("--users", type=int, default=20000, help="seed this many users first (0 = keep data)")
+    parser.add_argument("--requesters", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--num-perm", type=int, help="default: LSH_NUM_PERM")
+    parser.add_argument("--bands", type=int, help="default: LSH_BANDS")
+    parser.add_argument("--max-candidates", type=int, help="default: LSH_MAX_CANDIDATES")
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock instead of mongod")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_NAME"] = os.getenv("BENCH_DATABASE_NAME", "campus_connect_bench")
+    os.environ["SUGGESTION_CACHE_SIZE"] = "0"  # every call must really compute
+    # Settings are read at import, so the LSH shape goes in through the environment
+    for name, value in (("LSH_NUM_PERM", args.num_perm), ("LSH_BANDS", args.bands),
+                        ("LSH_MAX_CANDIDATES", args.max_candidates)):
+        if value is not None:
+            os.environ[name] = str(value)
+    if args.in_memory:
+        from benchmarks.run_benchmarks import _use_in_memory_database
+        _use_in_memory_database()
+    asyncio.run(main(args))
@@ -0,0 +1,98 @@
+# benchmarks/bench_roundtrips.py
+"""Count MongoDB round trips per get_top_matches call as the candidate pool grows.
+
+Usage: python benchmarks/bench_roundtrips.py [pool sizes...]
+Runs against MONGO_URI using a throwaway database (BENCH_DATABASE_NAME).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_NAME"] = os.getenv("BENCH_DATABASE_NAME", "campus_connect_bench")
+
+from pymongo import monitoring
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the server (find, aggregate, getMore, ...)"""
+
+    def __init__(self):
+        self.commands = {}
+
+    def reset(self):
+        self.commands = {}
+
+    def started(self, event):
+        self.commands[event.command_name] = self.commands.get(event.command_name, 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+counter = CommandCounter()
+monitoring.register(counter)  # must happen before the clients are created
+
+from app.database import client, users_collection, intents_collection
+from app.services.matcher import get_top_matches
+from datetime import datetime, timedelta
+import asyncio
+import random
+
+SKILLS = ["python", "react", "mongodb", "fastapi", "docker", "swift", "flutter", "go", "rust", "figma"]
+INTERESTS = ["ai", "web", "mobile", "sustainability", "fintech", "games", "health", "education"]
+
+
+def seed_pool(size: int):
+    """Insert `size` active users with one intent each"""
+
+    users_collection.delete_many({})
+    intents_collection.delete_many({})
+    rng = random.Random(size)
+    now = datetime.utcnow()
+
+    users = [{
+        "email": f"bench{i}@campus.edu",
+        "password_hash": "x",
+        "name": f"Bench User {i}",
+        "skills": rng.sample(SKILLS, 3),
+        "interests": rng.sample(INTERESTS, 2),
+        "bio": None,
+        "availability": "ACTIVE",
+        "is_deleted": False,
+        "created_at": now,
+        "updated_at": now,
+    } for i in range(size)]
+    user_ids = users_collection.insert_many(users).inserted_ids
+
+    intents = [{
+        "user_id": user_id,
+        "text": "benchmark intent",
+        "intent_type": "LOOKING_FOR_TEAM",
+        "keywords": rng.sample(SKILLS + INTERESTS, 3),
+        "status": "ACTIVE",
+        "keywords_auto_generated": True,
+        "created_at": now,
+        "updated_at": now,
+        "expires_at": now + timedelta(hours=48),
+    } for user_id in user_ids]
+    intents_collection.insert_many(intents)
+    return user_ids
+
+
+async def main(sizes):
+    print(f"{'candidates':>10} | {'round trips':>11} | commands")
+    for size in sizes:
+        user_ids = seed_pool(size)
+        counter.reset()
+        await get_top_matches(str(user_ids[0]), limit=10)
+        total = sum(counter.commands.values())
+        print(f"{size:>10} | {total:>11} | {counter.commands}")
+
+    client.drop_database(os.environ["DATABASE_NAME"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000]))
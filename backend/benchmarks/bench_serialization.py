@@ -0,0 +1,103 @@
+# benchmarks/bench_serialization.py
+"""Per-request CPU of the response step: model validation + response_model vs FastJSONResponse.
+
+Usage: python benchmarks/bench_serialization.py [--requests 500] [--sizes 1,10,50,200]
+Needs no database: documents come from seeds/generate_data.py and are served
+by a throwaway app whose routes mirror GET /intents/{user_id} and POST /auth/login
+(same models, same response_model), once per path. CPU is process time per
+request through the ASGI test client, so the (equal) client overhead is included.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.intent import IntentInDB
+from app.models.user import UserInDB, UserResponse
+from app.utils.fast_json import FastJSONResponse, intent_document, user_document
+from seeds.generate_data import generate_users
+import argparse
+import random
+import time
+
+
+def make_intents(user_id: ObjectId, count: int, rng: random.Random) -> list:
+    now = datetime.utcnow().replace(microsecond=rng.randint(0, 999) * 1000)
+    return [{
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "text": "Looking for a react and python developer for a campus app",
+        "intent_type": "LOOKING_FOR_TEAM",
+        "keywords": ["react", "python", "mobile", "education"],
+        "keyword_ids": [3, 17, 42, 51],
+        "status": "ACTIVE",
+        "keywords_auto_generated": True,
+        "created_at": now - timedelta(minutes=i),
+        "updated_at": now - timedelta(minutes=i),
+        "expires_at": now + timedelta(hours=48),
+    } for i in range(count)]
+
+
+def build_app(user: dict, intents_by_size: dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/validated/intents/{size}", response_model=List[IntentInDB])
+    async def validated_intents(size: int):
+        return [IntentInDB(**intent) for intent in intents_by_size[size]]
+
+    @app.get("/fast/intents/{size}", response_model=List[IntentInDB])
+    async def fast_intents(size: int):
+        return FastJSONResponse([intent_document(intent) for intent in intents_by_size[size]])
+
+    @app.get("/validated/login", response_model=UserResponse)
+    async def validated_login():
+        return UserResponse(success=True, message="Login successful", data=UserInDB(**user))
+
+    @app.get("/fast/login", response_model=UserResponse)
+    async def fast_login():
+        return FastJSONResponse({"success": True, "message": "Login successful", "data": user_document(user)})
+
+    return app
+
+
+def cpu_per_request(client: TestClient, path: str, requests: int) -> float:
+    for _ in range(min(20, requests)):
+        client.get(path)
+    start = time.process_time()
+    for _ in range(requests):
+        client.get(path)
+    return (time.process_time() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization CPU report")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--sizes", default="1,10,50,200", help="intents per list response")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    user = next(generate_users(1, args.seed, "$2b$12$" + "x" * 53))
+    user["_id"] = ObjectId()
+    intents_by_size = {size: make_intents(user["_id"], size, rng) for size in sizes}
+
+    with TestClient(build_app(user, intents_by_size)) as client:
+        # Same bytes either way (the fast path must not change the API)
+        for suffix in ["login"] + [f"intents/{size}" for size in sizes]:
+            assert client.get(f"/validated/{suffix}").json() == client.get(f"/fast/{suffix}").json(), suffix
+
+        print(f"{'endpoint':<20} {'validated':>12} {'fast':>12} {'saved':>12}")
+        for label, suffix in [("login", "login")] + [(f"intents x{size}", f"intents/{size}") for size in sizes]:
+            before = cpu_per_request(client, f"/validated/{suffix}", args.requests)
+            after = cpu_per_request(client, f"/fast/{suffix}", args.requests)
+            print(f"{label:<20} {before * 1e6:>10.0f}us {after * 1e6:>10.0f}us "
+                  f"{(before - after) * 1e6:>7.0f}us {(1 - after / before) * 100:>3.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/bench_shard_scaling.py
+"""Latency and throughput of the sharded matching engine at 1, 2, 4 and 8 workers.
+
+Usage:
+    python benchmarks/bench_shard_scaling.py [--users 20000] [--requesters 200] [--workers 1,2,4,8]
+                                             [--concurrency 16] [--in-memory] [--output shards.json]
+
+Seeds a throwaway database (BENCH_DATABASE_NAME), loads the candidate pool
+once, then times only the scoring step (what MATCHER_ENGINE=sharded moves
+out of the API process) for the same requesters:
+  in-process   one Shard holding the whole pool, scored in this process
+  N workers    ShardedMatcher(N): parallel local top-k per shard + merge
+`latency` is one request at a time; `throughput` keeps --concurrency
+requests in flight. Every sharded ranking is checked against the
+in-process one. Speedups need as many free cores as workers.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(label: str, seconds: list, wall: float, requests: int) -> dict:
+    result = {
+        "p50_ms": round(percentile(seconds, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(seconds, 0.95) * 1000, 2),
+        "throughput_rps": round(requests / wall, 1),
+    }
+    print(f"{label:<12} p50={result['p50_ms']:>8.2f}ms  p95={result['p95_ms']:>8.2f}ms  "
+          f"throughput={result['throughput_rps']:>8.1f} req/s")
+    return result
+
+
+async def run_sharded(matcher, requests: list, depth: int, min_score: float, concurrency: int):
+    latencies, rankings = [], []
+    for user_id, skill_ids, interest_ids, keyword_ids in requests:
+        started = time.perf_counter()
+        rankings.append(await matcher.query(skill_ids, interest_ids, keyword_ids, depth, min_score, user_id))
+        latencies.append(time.perf_counter() - started)
+
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(request):
+        user_id, skill_ids, interest_ids, keyword_ids = request
+        async with gate:
+            await matcher.query(skill_ids, interest_ids, keyword_ids, depth, min_score, user_id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(request) for request in requests))
+    return latencies, rankings, time.perf_counter() - started
+
+
+def main(args) -> None:
+    from app.services.candidates import iter_candidate_fields
+    from app.services.matcher import INTENTS_PER_USER, MIN_MATCH_SCORE, SUGGESTION_DEPTH
+    from app.services.shard_pool import Shard, ShardedMatcher
+    from seeds.generate_data import seed_synthetic
+
+    if args.users:
+        seed_synthetic(args.users, seed=args.seed)
+    rows = list(iter_candidate_fields(INTENTS_PER_USER))
+    pool_rows = [(user_id, skills, interests, keywords or interests) for user_id, skills, interests, keywords in rows]
+    requests = random.Random(args.seed).sample(rows, min(args.requesters, len(rows)))
+    print(f"{len(rows)} candidates, {len(requests)} requesters, depth {SUGGESTION_DEPTH}, {os.cpu_count()} CPUs")
+
+    summary = {"users": len(rows), "requesters": len(requests), "cpus": os.cpu_count(), "runs": {}}
+
+    # Baseline: the whole pool scored in this process, one request at a time
+    whole = Shard(pool_rows)
+    expected, latencies = [], []
+    started = time.perf_counter()
+    for user_id, skill_ids, interest_ids, keyword_ids in requests:
+        begin = time.perf_counter()
+        user = {"skill_ids": skill_ids, "interest_ids": interest_ids}
+        expected.append(whole.query(user, keyword_ids, SUGGESTION_DEPTH, MIN_MATCH_SCORE, user_id))
+        latencies.append(time.perf_counter() - begin)
+    summary["runs"]["in-process"] = summarize("in-process", latencies, time.perf_counter() - started, len(requests))
+
+    for workers in (int(value) for value in args.workers.split(",")):
+        matcher = ShardedMatcher(workers)
+        try:
+            build_started = time.perf_counter()
+            matcher.build(rows)
+            build_seconds = time.perf_counter() - build_started
+            latencies, rankings, wall = asyncio.run(
+                run_sharded(matcher, requests, SUGGESTION_DEPTH, MIN_MATCH_SCORE, args.concurrency)
+            )
+        finally:
+            matcher.shutdown()
+        label = f"{workers} workers"
+        result = summarize(label, latencies, wall, len(requests))
+        result["build_s"] = round(build_seconds, 2)
+        result["mismatches"] = sum(actual != wanted for actual, wanted in zip(rankings, expected))
+        if result["mismatches"]:
+            print(f"{'':<12} ⚠️  {result['mismatches']} rankings differ from the in-process engine")
+        summary["runs"][label] = result
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded matching scaling benchmark")
+    parser.add_argument("--users", type=int, default=20000, help="seed this many users first (0 = keep data)")
+    parser.add_argument("--requesters", type=int, default=200)
+    parser.add_argument("--workers", default="1,2,4,8", help="comma-separated worker counts")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight for throughput")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock instead of mongod")
+    parser.add_argument("--output", help="write the summary as JSON")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_NAME"] = os.getenv("BENCH_DATABASE_NAME", "campus_connect_bench")
+    if args.in_memory:
+        from benchmarks.run_benchmarks import _use_in_memory_database
+        _use_in_memory_database()
+    main(args)
@@ -0,0 +1,177 @@
+# benchmarks/bench_snapshot.py
+"""Match pool snapshot: worker startup and per-worker memory, mapped vs private copies.
+
+Usage:
+    python benchmarks/bench_snapshot.py [--users 20000] [--workers 4] [--requesters 100]
+                                        [--in-memory] [--output snapshot.json]
+
+Seeds a throwaway database (BENCH_DATABASE_NAME) and publishes a snapshot
+to a temp dir, then reports:
+  startup   full scan + encode (what every worker did) vs opening the file
+  memory    --workers processes alive at once, each scoring the same
+            requesters against either the mapped file (`mapped`) or its
+            own in-memory copy of the pool (`private`); per process PSS
+            (shared pages split between sharers) and private bytes, from
+            /proc/self/smaps_rollup (Linux)
+  parity    rankings from the mapped pool vs the in-process Shard
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import pickle
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+
+
+def smaps_rollup() -> dict:
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return values
+
+
+def child(snapshot_path: str, requests_path: str, mode: str) -> None:
+    """One worker: map (or copy) the pool, score every requester, report memory when told"""
+
+    from app.services.match_snapshot import MatchSnapshot, SnapshotShard
+    from app.services.matcher import MIN_MATCH_SCORE, SUGGESTION_DEPTH
+    import numpy as np
+
+    with open(requests_path, "rb") as f:
+        requests = pickle.load(f)
+    before = smaps_rollup()
+    snapshot = MatchSnapshot(snapshot_path)
+    if mode == "private":
+        # What a per-worker build holds: the same arrays, owned by this process
+        for matrix in (snapshot.pool.skills, snapshot.pool.interests, snapshot.pool.keywords):
+            matrix.row_ids, matrix.token_ids = np.array(matrix.row_ids), np.array(matrix.token_ids)
+            matrix.sizes, matrix.indptr = np.array(matrix.sizes), np.array(matrix.indptr)
+            matrix._postings = tuple(np.array(array) for array in matrix._postings)
+        snapshot.ids = np.array(snapshot.ids)
+    shard = SnapshotShard(snapshot)
+    for user_id, skill_ids, interest_ids, keyword_ids in requests:
+        shard.query({"skill_ids": skill_ids, "interest_ids": interest_ids}, keyword_ids,
+                    SUGGESTION_DEPTH, MIN_MATCH_SCORE, user_id)
+
+    print("ready", flush=True)
+    sys.stdin.readline()  # Measure only once every sibling is alive
+    after = smaps_rollup()
+    print(json.dumps({
+        "pss": after["Pss"] - before["Pss"],
+        "private": after["Private_Clean"] + after["Private_Dirty"]
+                   - before["Private_Clean"] - before["Private_Dirty"],
+    }), flush=True)
+
+
+def measure_workers(snapshot_path: str, requests_path: str, mode: str, workers: int) -> dict:
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, snapshot_path, requests_path]
+    processes = [subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                 for _ in range(workers)]
+    for process in processes:
+        assert process.stdout.readline().strip() == "ready"
+    samples = []
+    for process in processes:
+        process.stdin.write("measure\n")
+        process.stdin.flush()
+        samples.append(json.loads(process.stdout.readline()))
+    for process in processes:
+        process.wait()
+    return {
+        "pss_mb_per_worker": round(statistics.mean(s["pss"] for s in samples) / 1e6, 1),
+        "private_mb_per_worker": round(statistics.mean(s["private"] for s in samples) / 1e6, 1),
+    }
+
+
+def main(args) -> None:
+    from app.services.candidates import iter_candidate_fields
+    from app.services.match_snapshot import MatchSnapshot, SnapshotShard, write_snapshot
+    from app.services.matcher import INTENTS_PER_USER, MIN_MATCH_SCORE, SUGGESTION_DEPTH
+    from app.services.shard_pool import Shard
+    from seeds.generate_data import seed_synthetic
+
+    if args.users:
+        seed_synthetic(args.users, seed=args.seed)
+    summary = {}
+
+    # Startup: scan + encode (per worker before) vs file open (per worker now)
+    started = time.perf_counter()
+    scan_started_at = time.time()
+    rows = [(user_id, skills, interests, keywords or interests)
+            for user_id, skills, interests, keywords in iter_candidate_fields(INTENTS_PER_USER)]
+    scanned = time.perf_counter()
+    in_process = Shard(rows)
+    built = time.perf_counter()
+
+    directory = tempfile.mkdtemp(prefix="match_snapshot_")
+    snapshot_path = os.path.join(directory, "match_pool.snap")
+    write_snapshot(snapshot_path, rows, scan_started_at)
+    opened_at = time.perf_counter()
+    snapshot = MatchSnapshot(snapshot_path)
+    opened = time.perf_counter()
+    summary["startup"] = {
+        "users": len(rows),
+        "file_mb": round(os.path.getsize(snapshot_path) / 1e6, 1),
+        "scan_s": round(scanned - started, 3),
+        "encode_s": round(built - scanned, 3),
+        "open_ms": round((opened - opened_at) * 1000, 2),
+    }
+    print(f"startup   {len(rows)} users: scan {summary['startup']['scan_s']}s + encode "
+          f"{summary['startup']['encode_s']}s per worker -> open {summary['startup']['open_ms']}ms "
+          f"({summary['startup']['file_mb']} MB file)")
+
+    # Parity with the in-process shard
+    requests = random.Random(args.seed).sample(rows, min(args.requesters, len(rows)))
+    mapped = SnapshotShard(snapshot)
+    mismatches = 0
+    for user_id, skill_ids, interest_ids, keyword_ids in requests:
+        user = {"skill_ids": skill_ids, "interest_ids": interest_ids}
+        expected = in_process.query(user, keyword_ids, SUGGESTION_DEPTH, MIN_MATCH_SCORE, user_id)
+        mismatches += mapped.query(user, keyword_ids, SUGGESTION_DEPTH, MIN_MATCH_SCORE, user_id) != expected
+    summary["parity_mismatches"] = mismatches
+    print(f"parity    {len(requests) - mismatches}/{len(requests)} rankings identical")
+
+    # Memory with --workers siblings alive at once
+    requests_path = os.path.join(directory, "requests.pickle")
+    with open(requests_path, "wb") as f:
+        pickle.dump(requests, f)
+    for mode in ("private", "mapped"):
+        summary[mode] = measure_workers(snapshot_path, requests_path, mode, args.workers)
+        print(f"{mode:<9} {args.workers} workers: PSS {summary[mode]['pss_mb_per_worker']} MB/worker, "
+              f"private {summary[mode]['private_mb_per_worker']} MB/worker")
+
+    os.remove(requests_path)
+    os.remove(snapshot_path)
+    os.rmdir(directory)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[3], sys.argv[4], sys.argv[2])
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Match pool snapshot startup and memory benchmark")
+    parser.add_argument("--users", type=int, default=20000, help="seed this many users first (0 = keep data)")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes alive at once")
+    parser.add_argument("--requesters", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock instead of mongod")
+    parser.add_argument("--output", help="write the summary as JSON")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_NAME"] = os.getenv("BENCH_DATABASE_NAME", "campus_connect_bench")
+    if args.in_memory:
+        from benchmarks.run_benchmarks import _use_in_memory_database
+        _use_in_memory_database()
+    main(args)
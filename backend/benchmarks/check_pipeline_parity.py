@@ -0,0 +1,64 @@
+# benchmarks/check_pipeline_parity.py
+"""Check that the Python and aggregation-pipeline matcher engines rank identically.
+
+Usage: python benchmarks/check_pipeline_parity.py [--users 2000] [--requesters 200] [--seed 7]
+Runs against MONGO_URI using a throwaway database (BENCH_DATABASE_NAME) and
+needs a real mongod: the pipeline uses $lookup with let/pipeline.
+Exits non-zero on the first requester whose rankings differ.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["DATABASE_NAME"] = os.getenv("BENCH_DATABASE_NAME", "campus_connect_bench")
+os.environ["SUGGESTION_CACHE_SIZE"] = "0"  # every call must really compute
+
+from app.config import settings
+from app.database import users_collection
+from app.services.matcher import get_top_matches
+from seeds.generate_data import seed_synthetic
+import argparse
+import asyncio
+import time
+
+
+async def ranking(engine: str, user_id: str, limit: int):
+    settings.matcher_engine = engine
+    started = time.perf_counter()
+    matches = await get_top_matches(user_id, limit=limit)
+    return [(m["user_id"], m["score"]) for m in matches], time.perf_counter() - started
+
+
+async def main(args) -> int:
+    seed_synthetic(args.users, seed=args.seed)
+    requesters = [str(doc["_id"]) for doc in users_collection.find(
+        {"is_deleted": False, "availability": "ACTIVE"}, {"_id": 1}
+    ).limit(args.requesters)]
+
+    elapsed = {"python": 0.0, "pipeline": 0.0}
+    for user_id in requesters:
+        expected, python_seconds = await ranking("python", user_id, args.limit)
+        actual, pipeline_seconds = await ranking("pipeline", user_id, args.limit)
+        elapsed["python"] += python_seconds
+        elapsed["pipeline"] += pipeline_seconds
+        if [uid for uid, _ in expected] != [uid for uid, _ in actual] or \
+                any(float(a) != float(b) for (_, a), (_, b) in zip(expected, actual)):
+            print(f"❌ Rankings differ for {user_id}")
+            print(f"   python:   {expected}")
+            print(f"   pipeline: {actual}")
+            return 1
+
+    n = max(1, len(requesters))
+    print(f"✅ {len(requesters)} requesters: identical rankings and scores")
+    print(f"   mean per call  python={elapsed['python'] / n * 1000:.1f}ms  "
+          f"pipeline={elapsed['pipeline'] / n * 1000:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Python vs pipeline matcher parity")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--requesters", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,78 @@
+# benchmarks/check_read_routing.py
+"""Show where matching reads and primary reads actually go, and with which options.
+
+Usage: python benchmarks/check_read_routing.py
+Runs one read through the matching collections and one through the regular
+ones against MONGO_URI and prints, per command, the server that answered and
+the $readPreference / readConcern the driver sent. Works against a local
+single-host replica set:
+
+    mongod --replSet rs0 --dbpath /tmp/rs0 && mongosh --eval "rs.initiate()"
+    MONGO_URI="mongodb://localhost:27017/?replicaSet=rs0" \\
+    MATCHING_READ_PREFERENCE=secondaryPreferred MATCHING_READ_CONCERN=local \\
+    python benchmarks/check_read_routing.py
+
+With one member, secondaryPreferred falls back to the primary (the address
+stays the same) while the command still carries the configured preference;
+`secondary` fails server selection, which is the expected signal.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+from app.config import settings
+from app.database import matching_read_options, pool_options
+
+
+class _Recorder(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        if event.command_name in ("find", "aggregate"):
+            self.commands.append((
+                event.command_name,
+                f"{event.connection_id[0]}:{event.connection_id[1]}",
+                event.command.get("$readPreference", {"mode": "primary"}),
+                event.command.get("readConcern", {}),
+            ))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def main():
+    recorder = _Recorder()
+    client = MongoClient(
+        settings.mongo_uri, serverSelectionTimeoutMS=5000,
+        event_listeners=[recorder], **pool_options()
+    )
+    db = client[settings.database_name]
+    print(f"pool: {pool_options()}")
+    print(f"matching profile: {matching_read_options()}")
+
+    for label, collection in (
+        ("matching", db.get_collection("users", **matching_read_options())),
+        ("primary", db["users"]),
+    ):
+        try:
+            collection.find_one({}, {"_id": 1})
+        except PyMongoError as e:
+            print(f"{label:<9} read failed: {e.__class__.__name__}: {e}")
+            continue
+        name, address, read_preference, read_concern = recorder.commands[-1]
+        print(f"{label:<9} {name} -> {address}  readPreference={read_preference}  readConcern={read_concern}")
+
+    hello = client.admin.command("hello")
+    print(f"replica set: {hello.get('setName', '-')}  primary: {hello.get('primary', '-')}  "
+          f"hosts: {hello.get('hosts', [])}")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/check_scorer_parity.py
+"""Verify the vectorized batch scorer and top-k path match compute_compatibility exactly.
+
+Usage: python benchmarks/check_scorer_parity.py [pool size] [rounds]
+No database access is needed; profiles are generated in memory.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.matcher import compute_compatibility
+from app.services.batch_scorer import EncodedPool, score_pool, top_k
+import random
+
+TOKENS = ["python", "react", "mongodb", "fastapi", "docker", "swift", "flutter", "go",
+          "ai", "web", "mobile", "sustainability", "fintech", "games", "health", "design"]
+
+
+def random_profile(rng: random.Random) -> dict:
+    """Profile with possibly empty, possibly duplicated token lists"""
+
+    return {
+        "skills": [rng.choice(TOKENS) for _ in range(rng.randint(0, 6))],
+        "interests": [rng.choice(TOKENS) for _ in range(rng.randint(0, 5))],
+    }
+
+
+def random_keywords(rng: random.Random) -> list:
+    return [rng.choice(TOKENS) for _ in range(rng.randint(0, 9))]
+
+
+def main(pool_size: int, rounds: int):
+    rng = random.Random(42)
+    checked = 0
+
+    for _ in range(rounds):
+        user = random_profile(rng)
+        user_keywords = random_keywords(rng)
+        candidates = [random_profile(rng) for _ in range(pool_size)]
+        candidate_keywords = [random_keywords(rng) for _ in range(pool_size)]
+
+        pool = EncodedPool(candidates, candidate_keywords)
+        batch = score_pool(user, user_keywords, pool)
+        expected = []
+        for i, candidate in enumerate(candidates):
+            score = compute_compatibility(user, candidate, user_keywords, candidate_keywords[i])
+            if float(batch[i]) != score:
+                print(f"❌ Mismatch at candidate {i}: batch={batch[i]!r} scalar={score!r}")
+                sys.exit(1)
+            expected.append((i, score))
+            checked += 1
+
+        # Stable full sort is the reference ranking for the pruned top-k
+        expected = sorted((pair for pair in expected if pair[1] > 20), key=lambda p: p[1], reverse=True)
+        for k in (1, 5, 10, 50):
+            if top_k(user, user_keywords, pool, k, min_score=20) != expected[:k]:
+                print(f"❌ Top-{k} ranking differs from a full sort")
+                sys.exit(1)
+
+    print(f"✅ {checked} scores identical, top-k rankings match")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [2000, 50][len(args):]))
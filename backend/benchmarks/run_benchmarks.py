@@ -0,0 +1,204 @@
+# benchmarks/run_benchmarks.py
+"""Latency/throughput benchmark for the hot paths, with JSON output for comparing commits.
+
+Usage:
+    python benchmarks/run_benchmarks.py --users 10000 --output bench.json
+    python benchmarks/run_benchmarks.py --in-memory --users 2000 --compare bench.json
+
+Runs against MONGO_URI using BENCH_DATABASE_NAME (default campus_connect_bench),
+or against an in-memory mongomock stand-in with --in-memory
+(pip install mongomock mongomock-motor). The suggestion cache is disabled
+unless --cache is given, so every call measures a full computation.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+
+PERCENTILES = (50, 95, 99)
+
+SAMPLE_INTENTS = [
+    "Building a sustainability app with react and python, need a mobile developer",
+    "Looking for machine learning and data science people for a health platform",
+    "Need a flutter or swift developer for a campus events social network",
+    "Want to build a blockchain marketplace with javascript and mongodb",
+    "Creating an ai tutor for education, looking for fastapi backend help",
+]
+
+
+def _use_in_memory_database():
+    """Swap both Mongo clients for one shared mongomock store (before app import)"""
+
+    try:
+        import mongomock
+        import mongomock_motor
+    except ImportError:
+        sys.exit("--in-memory needs: pip install mongomock mongomock-motor")
+
+    import pymongo
+    import motor.motor_asyncio
+
+    shared = mongomock.MongoClient()
+    pymongo.MongoClient = lambda *args, **kwargs: shared
+    motor.motor_asyncio.AsyncIOMotorClient = (
+        lambda *args, **kwargs: mongomock_motor.AsyncMongoMockClient(mock_mongo_client=shared)
+    )
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: list, wall_seconds: float) -> dict:
+    ordered = sorted(latencies)
+    summary = {f"p{p}_ms": round(percentile(ordered, p) * 1000, 3) for p in PERCENTILES}
+    summary["mean_ms"] = round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0
+    summary["throughput_rps"] = round(len(ordered) / wall_seconds, 2) if wall_seconds else 0.0
+    summary["iterations"] = len(ordered)
+    return summary
+
+
+async def measure(name: str, call, args_list: list, warmup: int) -> dict:
+    """Run `call(*args)` sequentially for every args tuple and time each call"""
+
+    for args in args_list[:warmup]:
+        await call(*args)
+
+    latencies = []
+    wall_start = time.perf_counter()
+    for args in args_list:
+        start = time.perf_counter()
+        await call(*args)
+        latencies.append(time.perf_counter() - start)
+    wall = time.perf_counter() - wall_start
+
+    result = summarize(latencies, wall)
+    print(f"{name:<18} p50={result['p50_ms']:>9.3f}ms  p95={result['p95_ms']:>9.3f}ms  "
+          f"p99={result['p99_ms']:>9.3f}ms  {result['throughput_rps']:>9.2f} req/s")
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: dict, baseline_path: str) -> None:
+    """Print p50/p95/p99 deltas against an earlier result file"""
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print(f"\nvs {baseline.get('commit', '?')} ({baseline_path})")
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        deltas = []
+        for key in [f"p{p}_ms" for p in PERCENTILES]:
+            if before.get(key):
+                change = (result[key] - before[key]) / before[key] * 100
+                deltas.append(f"{key}={change:+.1f}%")
+        print(f"  {name:<18} {'  '.join(deltas)}")
+
+
+async def run(args) -> dict:
+    from app.database import users_collection
+    from app.services.keyword_index import keyword_index
+    from app.services.matcher import get_top_matches
+    from app.services.parser import extract_keywords
+    from app.main import quick_intent
+    from seeds.generate_data import seed_synthetic
+
+    if args.users:
+        seed_synthetic(args.users, seed=args.seed)
+    population = users_collection.count_documents({})
+    keyword_index.build(users_collection)
+
+    rng = random.Random(args.seed)
+    requesters = [str(doc["_id"]) for doc in users_collection.find(
+        {"is_deleted": False, "availability": "ACTIVE"}, {"_id": 1}
+    ).limit(max(args.iterations * 4, 100))]
+    if not requesters:
+        sys.exit("No active users to benchmark; seed some with --users")
+
+    texts = [rng.choice(SAMPLE_INTENTS) for _ in range(args.iterations)]
+
+    async def keywords_call(text):
+        extract_keywords(text)
+
+    print(f"population={population} iterations={args.iterations}")
+    results = {
+        "get_top_matches": await measure(
+            "get_top_matches", get_top_matches,
+            [(rng.choice(requesters), 10) for _ in range(args.iterations)], args.warmup
+        ),
+        "quick_intent": await measure(
+            "quick_intent", quick_intent,
+            [({"intent": text},) for text in texts], args.warmup
+        ),
+        "extract_keywords": await measure(
+            "extract_keywords", keywords_call,
+            [(text,) for text in texts * 20], args.warmup
+        ),
+    }
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "database": "mongomock" if args.in_memory else "mongod",
+        "population": population,
+        "seed": args.seed,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark matching hot paths")
+    parser.add_argument("--users", type=int, default=0, help="seed this many synthetic users first")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock instead of mongod")
+    parser.add_argument("--cache", action="store_true", help="keep the suggestion cache enabled")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier result file to diff against")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_NAME"] = os.getenv("BENCH_DATABASE_NAME", "campus_connect_bench")
+    if not args.cache:
+        os.environ["SUGGESTION_CACHE_SIZE"] = "0"
+    if args.in_memory:
+        _use_in_memory_database()
+
+    report = asyncio.run(run(args))
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results written to {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
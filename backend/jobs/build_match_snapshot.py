@@ -0,0 +1,55 @@
+# jobs/build_match_snapshot.py
+"""Build the match pool snapshot that MATCHER_ENGINE=snapshot workers map read-only.
+
+Usage: python jobs/build_match_snapshot.py [--output PATH] [--every SECONDS]
+Scans active users and their latest intents once, encodes token-id postings
+and per-user arrays into one flat file and publishes it with an atomic
+rename (default MATCH_SNAPSHOT_PATH). Workers pick up the new version within
+MATCH_SNAPSHOT_CHECK_SECONDS. Run it with --every in production (one
+instance, e.g. as a sidecar): until a newer file appears, every worker
+layers and folds each later write on its own.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database import client
+from app.services.candidates import iter_candidate_fields
+from app.services.match_snapshot import write_snapshot
+from app.services.matcher import INTENTS_PER_USER
+import argparse
+import time
+
+
+def build(path: str) -> None:
+    started = time.perf_counter()
+    scan_started_at = time.time()
+    # Workers' change feeds replay from here what the scan may have missed
+    operation_time = client.admin.command("ping").get("operationTime")
+    rows = [
+        (user_id, skill_ids, interest_ids, keyword_ids or interest_ids)
+        for user_id, skill_ids, interest_ids, keyword_ids in iter_candidate_fields(INTENTS_PER_USER)
+    ]
+    scanned = time.perf_counter()
+    header = write_snapshot(path, rows, scan_started_at, operation_time)
+    size_mb = os.path.getsize(path) / 1e6
+    print(f"✅ Published {path}: {header['users']} users, {size_mb:.1f} MB "
+          f"(scan {scanned - started:.1f}s, encode+write {time.perf_counter() - scanned:.1f}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and publish the match pool snapshot")
+    parser.add_argument("--output", default=settings.match_snapshot_path)
+    parser.add_argument("--every", type=int, default=0, help="republish every N seconds (0 = once)")
+    args = parser.parse_args()
+
+    while True:
+        build(args.output)
+        if args.every <= 0:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
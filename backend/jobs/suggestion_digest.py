@@ -0,0 +1,78 @@
+# jobs/suggestion_digest.py
+"""Top-k suggestions for a list of users, or everyone, in one run (nightly digest).
+
+Usage: python jobs/suggestion_digest.py [--all | --users ids.txt] [--limit 5]
+                                        [--output digest.ndjson] [--with-scores]
+--users reads one user id per line. Writes NDJSON, one line per user:
+{"user_id": ..., "suggestions": [...]}, flushed as each chunk finishes.
+Candidates and their intent keywords are loaded once for the whole run.
+Scores are omitted unless --with-scores is given (internal use only).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from app.routes.suggestions import suggestion_card
+from app.services.batch_suggestions import SuggestionPool, stream_suggestions
+import argparse
+import asyncio
+import json
+import time
+
+
+async def run(user_ids, limit: int, out, with_scores: bool) -> dict:
+    started = time.perf_counter()
+    pool = await SuggestionPool.load()
+    loaded = time.perf_counter()
+
+    users = 0
+    with_matches = 0
+    async for user_id, matches in stream_suggestions(user_ids, limit, pool):
+        suggestions = matches if with_scores else [suggestion_card(match) for match in matches]
+        out.write(json.dumps({"user_id": str(user_id), "suggestions": suggestions}) + "\n")
+        users += 1
+        with_matches += bool(matches)
+        if users % 1000 == 0:
+            out.flush()
+            print(f"   {users} users done", file=sys.stderr)
+    out.flush()
+
+    return {
+        "candidates": len(pool),
+        "users": users,
+        "with_matches": with_matches,
+        "pool_load_s": round(loaded - started, 2),
+        "total_s": round(time.perf_counter() - started, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch suggestions for digests and precompute jobs")
+    who = parser.add_mutually_exclusive_group(required=True)
+    who.add_argument("--all", action="store_true", help="every user that can get suggestions")
+    who.add_argument("--users", help="file with one user id per line")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--output", help="NDJSON file (default: stdout)")
+    parser.add_argument("--with-scores", action="store_true", help="keep the hidden scores in the output")
+    args = parser.parse_args()
+
+    user_ids = None
+    if args.users:
+        with open(args.users) as f:
+            user_ids = [ObjectId(line.strip()) for line in f if line.strip()]
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        report = asyncio.run(run(user_ids, max(1, args.limit), out, args.with_scores))
+    finally:
+        if args.output:
+            out.close()
+
+    print(f"✅ Suggestions for {report['users']} users ({report['with_matches']} with matches) "
+          f"from {report['candidates']} candidates: pool load {report['pool_load_s']}s, "
+          f"total {report['total_s']}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
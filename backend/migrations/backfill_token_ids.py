@@ -0,0 +1,56 @@
+# migrations/backfill_token_ids.py
+"""Store integer token ids next to the raw strings on existing documents.
+
+Usage: python migrations/backfill_token_ids.py [--batch-size 1000] [--all]
+Users get skill_ids/interest_ids, intents get keyword_ids. Only documents
+missing an id field are touched unless --all is given, so the script is safe
+to re-run (e.g. after seeding with seeds/seed_data.py).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne
+from app.database import users_collection, intents_collection
+from app.services.vocabulary import token_vocabulary, TOKEN_ID_FIELDS
+import argparse
+import time
+
+
+def backfill(collection, fields: list, batch_size: int, everything: bool) -> int:
+    """Write <field> ids for every document missing one of them; returns documents updated"""
+
+    id_fields = [TOKEN_ID_FIELDS[field] for field in fields]
+    query = {} if everything else {"$or": [{id_field: {"$exists": False}} for id_field in id_fields]}
+    projection = {field: 1 for field in fields}
+
+    updated = 0
+    ops = []
+    for doc in collection.find(query, projection):
+        ids = {TOKEN_ID_FIELDS[field]: token_vocabulary.ids_for(doc.get(field) or []) for field in fields}
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": ids}))
+        if len(ops) == batch_size:
+            updated += collection.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += collection.bulk_write(ops, ordered=False).modified_count
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill integer token ids")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--all", action="store_true", help="re-encode documents that already have ids")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    token_vocabulary.load()
+    users = backfill(users_collection, ["skills", "interests"], args.batch_size, args.all)
+    intents = backfill(intents_collection, ["keywords"], args.batch_size, args.all)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Token ids written: {users} users, {intents} intents "
+          f"({len(token_vocabulary)} tokens) in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# migrations/create_indexes.py
+"""Create every index the app relies on. Idempotent: run it on deploy, not per worker.
+
+Usage: python migrations/create_indexes.py [--dry-run]
+Existing indexes with the same keys are left alone, so re-running is a no-op;
+the unique indexes (users.email, vocabulary.token) are required for correct
+duplicate handling and must exist before the API takes writes.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import db
+import argparse
+import time
+
+# collection -> [(keys, options)]
+INDEXES = {
+    "users": [
+        ([("email", 1)], {"unique": True}),
+        ([("created_at", 1)], {}),
+    ],
+    "intents": [
+        # Per-user active intents, newest first (matching, GET /intents/{user_id})
+        ([("user_id", 1), ("status", 1), ("expires_at", 1), ("created_at", -1)], {}),
+        ([("keywords", 1)], {}),
+        # Sweeper: ACTIVE intents past expires_at
+        ([("status", 1), ("expires_at", 1)], {}),
+    ],
+    "vocabulary": [
+        ([("token", 1)], {"unique": True}),
+    ],
+    "collaborations": [
+        ([("target_user_id", 1)], {}),
+        ([("status", 1)], {}),
+    ],
+}
+
+
+def ensure_indexes(database, dry_run: bool = False) -> list:
+    """Create missing indexes; returns "collection.index_name" for each one created"""
+
+    created = []
+    for collection_name, specs in INDEXES.items():
+        collection = database[collection_name]
+        existing = {tuple(info["key"]) for info in collection.index_information().values()}
+        for keys, options in specs:
+            if tuple(keys) in existing:
+                continue
+            name = "_".join(f"{field}_{direction}" for field, direction in keys)
+            if not dry_run:
+                name = collection.create_index(keys, **options)
+            created.append(f"{collection_name}.{name}")
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create MongoDB indexes")
+    parser.add_argument("--dry-run", action="store_true", help="only list the indexes that are missing")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    created = ensure_indexes(db, args.dry_run)
+    elapsed = time.perf_counter() - started
+    verb = "Missing" if args.dry_run else "Created"
+    for name in created:
+        print(f"   {verb}: {name}")
+    print(f"✅ {len(created)} indexes {verb.lower()} in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# seeds/generate_data.py
+"""Seeded, reproducible synthetic users + intents at any scale.
+
+Usage: python seeds/generate_data.py --users 100000 [--seed 7] [--keep]
+Profiles use the same shape as seed_data.py and are written with bulk inserts.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import users_collection, intents_collection
+from app.services.parser import extract_keywords_batch
+from app.services.vocabulary import token_vocabulary
+from datetime import datetime, timedelta
+import argparse
+import random
+import bcrypt
+import time
+
+SKILLS = [
+    "python", "fastapi", "mongodb", "docker", "react", "javascript", "typescript", "tailwind",
+    "vue", "nuxt", "graphql", "nodejs", "flutter", "swift", "kotlin", "android", "ios",
+    "tensorflow", "pytorch", "pandas", "sql", "kubernetes", "aws", "gcp", "azure", "terraform",
+    "solidity", "rust", "go", "c++", "unity", "unreal", "godot", "figma", "blender", "django",
+    "rails", "nextjs", "postgres", "redis", "kafka", "spark", "selenium", "cypress",
+]
+
+INTERESTS = [
+    "web dev", "ai", "sustainability", "frontend", "ui/ux", "design", "performance", "mobile",
+    "fitness", "health", "music", "education", "social", "data science", "visualization",
+    "computer vision", "robotics", "devops", "cloud", "blockchain", "defi", "web3",
+    "game dev", "security", "testing", "startup", "marketing", "fintech", "open source",
+]
+
+PRODUCTS = ["platform", "app", "dashboard", "marketplace", "game", "tool", "api", "bot", "pipeline"]
+
+INTENT_TEMPLATES = [
+    ("BUILDING_PROJECT", "Building a {interest} {product} with {skill}, need {other} support"),
+    ("LOOKING_FOR_TEAM", "Looking for a {other} developer to join our {interest} {product}"),
+    ("SKILL_SHARE", "Happy to teach {skill} to anyone working on {interest} projects"),
+]
+
+FIRST_NAMES = ["Alice", "Bob", "Carol", "David", "Emma", "Frank", "Gina", "Hiro", "Ivy", "Jack",
+               "Kara", "Leo", "Maya", "Nina", "Oscar", "Priya", "Quinn", "Ravi", "Sara", "Tom"]
+LAST_NAMES = ["Chen", "Johnson", "Martinez", "Kim", "Patel", "Nguyen", "Garcia", "Smith",
+              "Huang", "Blake", "Scott", "White", "Pierce", "Thompson", "Okafor", "Silva"]
+
+
+def _weighted_sample(rng: random.Random, population: list, weights: list, k: int) -> list:
+    """k distinct items, popular ones (Zipf-like weights) more likely"""
+
+    chosen = []
+    while len(chosen) < k:
+        item = rng.choices(population, weights)[0]
+        if item not in chosen:
+            chosen.append(item)
+    return chosen
+
+
+def generate_users(count: int, seed: int, password_hash: str):
+    """Yield `count` user documents; the same seed always yields the same users"""
+
+    rng = random.Random(seed)
+    skill_weights = [1 / (rank + 1) for rank in range(len(SKILLS))]
+    interest_weights = [1 / (rank + 1) for rank in range(len(INTERESTS))]
+    now = datetime.utcnow()
+
+    for i in range(count):
+        created_at = now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+        yield {
+            "email": f"user{seed}-{i}@campus{i % 50}.edu",
+            "password_hash": password_hash,
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "skills": _weighted_sample(rng, SKILLS, skill_weights, rng.randint(1, 6)),
+            "interests": _weighted_sample(rng, INTERESTS, interest_weights, rng.randint(1, 4)),
+            "bio": f"Synthetic profile #{i}" if rng.random() < 0.7 else None,
+            "availability": rng.choices(["ACTIVE", "INACTIVE", "ON_BREAK"], [85, 10, 5])[0],
+            "is_deleted": rng.random() < 0.02,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def generate_intents(user_docs: list, rng: random.Random, max_per_user: int) -> list:
+    """0..max_per_user intents per user, keywords extracted like submit_intent does"""
+
+    now = datetime.utcnow()
+    drafts = []
+    for user in user_docs:
+        for _ in range(rng.randint(0, max_per_user)):
+            intent_type, template = rng.choice(INTENT_TEMPLATES)
+            text = template.format(
+                interest=rng.choice(user["interests"]),
+                product=rng.choice(PRODUCTS),
+                skill=rng.choice(user["skills"]),
+                other=rng.choice(SKILLS),
+            )
+            created_at = now - timedelta(hours=rng.randint(0, 96))
+            drafts.append({
+                "user_id": user["_id"],
+                "text": text,
+                "intent_type": intent_type,
+                "status": rng.choices(["ACTIVE", "MATCHED", "ARCHIVED"], [80, 10, 10])[0],
+                "keywords_auto_generated": True,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "expires_at": created_at + timedelta(hours=48),
+            })
+
+    for draft, keywords in zip(drafts, extract_keywords_batch([d["text"] for d in drafts])):
+        draft["keywords"] = keywords
+        draft["keyword_ids"] = token_vocabulary.ids_for(keywords)
+    return drafts
+
+
+def seed_synthetic(users: int, seed: int = 7, batch_size: int = 5000,
+                   max_intents_per_user: int = 3, drop: bool = True) -> dict:
+    """Generate and bulk-insert `users` users plus their intents"""
+
+    if drop:
+        users_collection.delete_many({})
+        intents_collection.delete_many({})
+
+    # One hash for everyone ("pass1234"): bcrypt per user would dominate seeding time
+    password_hash = bcrypt.hashpw(b"pass1234", bcrypt.gensalt()).decode("utf-8")
+    intent_rng = random.Random(seed + 1)
+    started = time.perf_counter()
+    user_total = 0
+    intent_total = 0
+
+    batch = []
+    for user in generate_users(users, seed, password_hash):
+        batch.append(user)
+        if len(batch) == batch_size:
+            user_total, intent_total = _flush(batch, intent_rng, max_intents_per_user, user_total, intent_total)
+            batch = []
+    if batch:
+        user_total, intent_total = _flush(batch, intent_rng, max_intents_per_user, user_total, intent_total)
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Seeded {user_total} users with {intent_total} intents in {elapsed:.1f}s")
+    return {"users": user_total, "intents": intent_total, "seconds": round(elapsed, 2)}
+
+
+def _flush(batch: list, rng: random.Random, max_intents_per_user: int, user_total: int, intent_total: int):
+    for user in batch:
+        user["skill_ids"] = token_vocabulary.ids_for(user["skills"])
+        user["interest_ids"] = token_vocabulary.ids_for(user["interests"])
+    result = users_collection.insert_many(batch, ordered=False)
+    for user, user_id in zip(batch, result.inserted_ids):
+        user["_id"] = user_id
+
+    intents = generate_intents(batch, rng, max_intents_per_user)
+    if intents:
+        intents_collection.insert_many(intents, ordered=False)
+    return user_total + len(batch), intent_total + len(intents)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed synthetic users and intents")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--max-intents", type=int, default=3, help="max intents per user")
+    parser.add_argument("--keep", action="store_true", help="append instead of clearing collections")
+    args = parser.parse_args()
+
+    seed_synthetic(args.users, args.seed, args.batch_size, args.max_intents, drop=not args.keep)
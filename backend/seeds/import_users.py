@@ -0,0 +1,44 @@
+# seeds/import_users.py
+"""Bulk-register users from a CSV or NDJSON file (same path as POST /auth/import).
+
+Usage: python seeds/import_users.py cohort.csv [--format csv|ndjson] [--batch-size 1000]
+                                              [--workers N] [--report errors.json]
+CSV needs a header row: email,password,name,skills,interests,bio
+(skills/interests separated by ';'). NDJSON has one UserCreate object per line.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.user_import import import_users, read_records
+import argparse
+import asyncio
+import json
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk user import")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="default: from the file extension")
+    parser.add_argument("--batch-size", type=int, help="rows per validate/hash/insert batch")
+    parser.add_argument("--workers", type=int, help="bcrypt processes (default: all cores)")
+    parser.add_argument("--report", help="write the full JSON report here")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    with open(args.path, encoding="utf-8-sig", newline="") as f:
+        report = asyncio.run(import_users(read_records(f, fmt), args.batch_size, args.workers))
+
+    print(f"✅ Imported {report['inserted']}/{report['total']} users in {report['seconds']}s "
+          f"({report['failed']} failed)")
+    for error in report["errors"][:20]:
+        print(f"   row {error['row']}: {error['email'] or '-'}: {error['error']}")
+    if report["failed"] > 20:
+        print(f"   ... {report['failed'] - 20} more")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
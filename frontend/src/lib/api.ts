@@ -8,6 +8,11 @@ export interface ConnectionResult {
   expertise?: { skill: string; level: number }[];
 }
 
+export interface ConnectionPage {
+  results: ConnectionResult[];
+  next_cursor: string | null;
+}
+
 export interface User {
   id: string;
   email: string;
@@ -107,3 +112,50 @@ export async function findConnections(
 
   return handleApiResponse<ConnectionResult[]>(response);
 }
+
+// Keyset-paginated results: pass the previous page's next_cursor to continue
+export async function searchConnections(
+  intent: string,
+  cursor?: string | null,
+  limit = 15
+): Promise<ConnectionPage> {
+  const response = await fetch(`${API_BASE_URL}/intent/search`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ intent, cursor, limit }),
+  });
+
+  return handleApiResponse<ConnectionPage>(response);
+}
+
+// NDJSON stream: onResult fires for each result as soon as it is ranked
+export async function streamConnections(
+  intent: string,
+  onResult: (result: ConnectionResult) => void
+): Promise<void> {
+  const response = await fetch(`${API_BASE_URL}/intent/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ intent }),
+  });
+
+  if (!response.ok || !response.body) {
+    await handleApiResponse<unknown>(response);
+    return;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffered += decoder.decode(value, { stream: !done });
+    const lines = buffered.split("\n");
+    buffered = lines.pop() ?? "";
+    for (const line of lines) {
+      if (line.trim()) onResult(JSON.parse(line) as ConnectionResult);
+    }
+    if (done) break;
+  }
+  if (buffered.trim()) onResult(JSON.parse(buffered) as ConnectionResult);
+}